@@ -6,16 +6,30 @@ Features: S3 data persistence, password authentication, multi-store analysis.
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import io
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
+from functools import reduce
+from itertools import islice
 import hashlib
+import hmac
 import json
+import re
+import time
 
 # Import all services from the dashboard package
 from dashboard import (
@@ -72,6 +86,10 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Copy-on-Write: derived frames share buffers until written, so cleaners and
+# filters no longer need defensive deep copies
+pd.set_option('mode.copy_on_write', True)
+
 # =============================================================================
 # CHAPTERS DESIGN SYSTEM - Custom CSS Styling
 # =============================================================================
@@ -2029,35 +2047,97 @@ STORE_DISPLAY_NAMES = {
     "grass_roots": "Grass Roots"
 }
 
+# Reverse lookup from display name to store ID for store filters
+STORE_ID_BY_DISPLAY = {name: store_id for store_id, name in STORE_DISPLAY_NAMES.items()}
+
+# Store choices offered on the Data Center upload settings
+UPLOAD_STORE_IDS = {**STORE_ID_BY_DISPLAY, "Both Stores (Combined)": "combined"}
+
 # Sample prefixes to filter out (not actual sales)
 # [DS] = Display Samples, [SS] = Staff Samples
-SAMPLE_PREFIXES = ["[DS]", "[SS]"]
+SAMPLE_PREFIXES = ("[DS]", "[SS]")
+
+# Promotional line items ("$1" deals, "Promo" brands) kept out of AI brand context
+PROMO_BRAND_RE = re.compile(r'\$1|Promo', re.IGNORECASE)
+
+# Quick-mapping edits are coalesced into one S3 write after this many edits,
+# or on the first edit once this many seconds have passed since the last write
+MAPPING_FLUSH_EDITS = 20
+MAPPING_FLUSH_SECONDS = 5
+
+# Processed data is persisted as Parquet (Snappy) unless LEGACY_CSV is set
+LEGACY_CSV = bool(os.environ.get("LEGACY_CSV"))
+
+# Chunk sizes used when streaming S3 bodies
+STREAM_CHUNK_BYTES = 1 << 20
+PARQUET_BATCH_ROWS = 64_000
+
+# Lifetime of presigned direct-upload URLs in the Data Center
+DIRECT_UPLOAD_URL_SECONDS = 900
+
+# Upload keys embed their report period: type_YYYYMMDD-YYYYMMDD_timestamp.csv
+UPLOAD_DATE_RANGE_RE = re.compile(r'_(\d{8})-(\d{8})_')
+
+# Numeric Treez report columns are typed up front for the Arrow CSV reader, so
+# a column that is blank in the first block cannot fail type inference later in
+# the file and force the pandas fallback (a second GET and a slower parse)
+REPORT_COLUMN_TYPES = {
+    col: pa.float64() for col in (
+        'Tickets Count', 'Units Sold', 'Customers Count', 'New Customers',
+        'Gross Sales', 'Discounts', 'Returns', 'Net Sales', 'Taxes',
+        'Gross Receipts', 'COGS (with excise)', 'Gross Income',
+        'Gross Margin %', 'Discount %', 'Cost %',
+        'Avg Basket Size', 'Avg Order Value', 'Avg Order Profit',
+        '% of Total Net Sales', 'Avg Cost (w/o excise)'
+    )
+}
 
 # =============================================================================
 # AUTHENTICATION
 # =============================================================================
 
+# Default credentials used when secrets.toml has no [passwords] section
+_DEFAULT_CREDENTIALS = (("admin", "changeme123"), ("analyst", "viewonly456"))
+
+# Password hashes are either legacy SHA-256 hex digests or "scrypt$<hex>"
+SCRYPT_PREFIX = "scrypt$"
+_SCRYPT_SALT = b"retail-analytics-dashboard"
+
+
+def hash_password(password: str) -> str:
+    """Hash a password with scrypt for storage in secrets.toml."""
+    digest = hashlib.scrypt(password.encode(), salt=_SCRYPT_SALT, n=2**14, r=8, p=1)
+    return SCRYPT_PREFIX + digest.hex()
+
+
+def _verify_password(password: str, stored_hash: str) -> bool:
+    """Check a password against a stored scrypt or legacy SHA-256 hash in constant time."""
+    if stored_hash.startswith(SCRYPT_PREFIX):
+        entered_hash = hash_password(password)
+    else:
+        entered_hash = hashlib.sha256(password.encode()).hexdigest()
+    return hmac.compare_digest(entered_hash, stored_hash)
+
+
+@st.cache_resource
+def _get_users() -> dict:
+    """Load the users table once per process instead of on every rerun."""
+    try:
+        return dict(st.secrets["passwords"])
+    except Exception:
+        return {username: hash_password(password) for username, password in _DEFAULT_CREDENTIALS}
+
+
 def check_password():
     """Returns True if the user has entered a correct password."""
 
     def validate_credentials(username: str, password: str) -> bool:
         """Validate username and password credentials."""
-        # In production, use environment variables or AWS Secrets Manager
-        default_users = {
-            "admin": hashlib.sha256("changeme123".encode()).hexdigest(),
-            "analyst": hashlib.sha256("viewonly456".encode()).hexdigest()
-        }
-
-        try:
-            users = st.secrets["passwords"]
-        except:
-            users = default_users
-
         if not username or not password:
             return False
 
-        entered_hash = hashlib.sha256(password.encode()).hexdigest()
-        return username in users and users[username] == entered_hash
+        stored_hash = _get_users().get(username)
+        return bool(stored_hash) and _verify_password(password, stored_hash)
 
     if st.session_state.get("password_correct", False):
         return True
@@ -2262,6 +2342,63 @@ def check_password():
 # S3 INTEGRATION
 # =============================================================================
 
+# Multipart settings for buffered downloads (ranged GETs in 8 MiB parts)
+S3_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=16 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=8,
+    use_threads=True
+)
+
+# Multipart settings for uploads: anything over 8 MiB is sent as 16 MiB parts
+# on parallel threads, read straight from the file object
+S3_UPLOAD_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=16 * 1024 * 1024,
+    max_concurrency=8,
+    use_threads=True
+)
+
+# Upper bound on concurrent object fetches when loading many files at once
+S3_DOWNLOAD_WORKERS = 16
+
+
+@st.cache_resource
+def _get_pooled_s3_client(aws_access_key: str, aws_secret_key: str, aws_region: str):
+    """
+    Get a pooled S3 client shared across Streamlit reruns.
+    Reusing one client keeps its keep-alive connections open instead of paying
+    a new TLS handshake for every download on every rerun.
+    """
+    boto_config = Config(
+        connect_timeout=5,
+        read_timeout=10,
+        retries={'max_attempts': 2, 'mode': 'adaptive'},
+        max_pool_connections=32,
+        tcp_keepalive=True
+    )
+    return boto3.client(
+        's3',
+        aws_access_key_id=aws_access_key,
+        aws_secret_access_key=aws_secret_key,
+        region_name=aws_region,
+        config=boto_config
+    )
+
+
+@st.cache_data(ttl=3600, max_entries=64, show_spinner=False)
+def _load_cleaned_s3_file(bucket_name: str, s3_key: str, etag: str, clean_method: str, _s3_manager, _processor) -> pd.DataFrame:
+    """
+    Download and clean a single S3 file.
+    Cached on (bucket, key, ETag, cleaner) so unchanged files are neither downloaded
+    nor re-cleaned when another file in the bucket changes.
+    """
+    df = _s3_manager.download_file(s3_key, use_cache=False)
+    if df is None or df.empty:
+        return None
+    return getattr(_processor, clean_method)(df)
+
+
 class S3DataManager:
     """Manages data persistence with AWS S3 with optimized caching."""
 
@@ -2301,20 +2438,7 @@ class S3DataManager:
             self.bucket_name = bucket_name
 
             if aws_access_key and aws_secret_key:
-                from botocore.config import Config
-                # Configure timeouts to prevent hanging on network issues
-                boto_config = Config(
-                    connect_timeout=5,
-                    read_timeout=10,
-                    retries={'max_attempts': 2}
-                )
-                self.s3_client = boto3.client(
-                    's3',
-                    aws_access_key_id=aws_access_key,
-                    aws_secret_access_key=aws_secret_key,
-                    region_name=aws_region,
-                    config=boto_config
-                )
+                self.s3_client = _get_pooled_s3_client(aws_access_key, aws_secret_key, aws_region)
                 # Initialize optimized data loader with caching
                 self._optimized_loader = get_data_loader(bucket_name, ttl=3600)
                 self._cache_manager = get_cache_manager()
@@ -2352,7 +2476,7 @@ class S3DataManager:
             return False, self.connection_error or "S3 not configured"
         
         try:
-            self.s3_client.upload_fileobj(file_obj, self.bucket_name, s3_key)
+            self.s3_client.upload_fileobj(file_obj, self.bucket_name, s3_key, Config=S3_UPLOAD_CONFIG)
             return True, f"Uploaded to s3://{self.bucket_name}/{s3_key}"
         except ClientError as e:
             error_code = e.response.get('Error', {}).get('Code', 'Unknown')
@@ -2361,12 +2485,33 @@ class S3DataManager:
         except Exception as e:
             return False, f"Upload failed: {e}"
     
-    def download_file(self, s3_key: str, use_cache: bool = True) -> pd.DataFrame:
-        """Download a CSV file from S3 and return as DataFrame with caching."""
+    def generate_presigned_put(self, s3_key: str, expires: int = 900, content_type: str = "text/csv") -> str:
+        """
+        Create a short-lived URL the browser can PUT a file to directly, so the
+        bytes never pass through the Streamlit server. Returns None on failure.
+        """
+        if not self.is_configured():
+            return None
+        try:
+            return self.s3_client.generate_presigned_url(
+                'put_object',
+                Params={'Bucket': self.bucket_name, 'Key': s3_key, 'ContentType': content_type},
+                ExpiresIn=expires
+            )
+        except ClientError:
+            return None
+
+    def download_file(self, s3_key: str, use_cache: bool = True, columns: list = None) -> pd.DataFrame:
+        """
+        Download a CSV or Parquet file from S3 and return as DataFrame with caching.
+        Keys ending in .parquet are read as Parquet; `columns` limits the columns read.
+        """
         if not self.is_configured():
             return None
 
         cache_key = f"s3_csv_{self.bucket_name}_{s3_key}"
+        if columns:
+            cache_key = f"{cache_key}_{'|'.join(columns)}"
         current_etag = None
 
         # Try to use cache if available
@@ -2384,8 +2529,7 @@ class S3DataManager:
                     if cached_df is not None:
                         return cached_df
 
-            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=s3_key)
-            df = pd.read_csv(io.BytesIO(response['Body'].read()), low_memory=False)
+            df = self._read_object(s3_key, columns)
 
             # Cache the result
             if use_cache and self._cache_manager:
@@ -2401,28 +2545,122 @@ class S3DataManager:
             st.error(f"Download failed: {e}")
             return None
     
+    def _read_object(self, s3_key: str, columns: list = None) -> pd.DataFrame:
+        """
+        Stream an S3 object into a DataFrame without materializing the body twice.
+        CSV bodies are decoded incrementally into Arrow record batches; Parquet needs
+        random access to its footer, so it is buffered once and converted batch by batch.
+        """
+        if s3_key.endswith('.parquet'):
+            buffer = io.BytesIO()
+            self.s3_client.download_fileobj(self.bucket_name, s3_key, buffer, Config=S3_TRANSFER_CONFIG)
+            parquet_file = pq.ParquetFile(pa.BufferReader(buffer.getbuffer()))
+            batches = list(parquet_file.iter_batches(batch_size=PARQUET_BATCH_ROWS, columns=columns))
+            table = pa.Table.from_batches(batches) if batches else parquet_file.read(columns=columns)
+            return table.to_pandas(self_destruct=True, split_blocks=True)
+
+        response = self.s3_client.get_object(Bucket=self.bucket_name, Key=s3_key)
+        try:
+            # Blank text cells load as null, matching pd.read_csv and the upload path
+            convert_options = pa_csv.ConvertOptions(
+                include_columns=columns, column_types=REPORT_COLUMN_TYPES,
+                strings_can_be_null=True, quoted_strings_can_be_null=True
+            )
+            reader = pa_csv.open_csv(response['Body'], convert_options=convert_options)
+            table = pa.Table.from_batches(list(reader), schema=reader.schema)
+            return table.to_pandas(self_destruct=True, split_blocks=True)
+        except pa.ArrowInvalid:
+            # Type inference from the first block failed later in the file -
+            # re-fetch and let pandas parse it, streaming the body in 1MB chunks
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=s3_key)
+            body = response['Body']
+            buffer = io.BytesIO()
+            for chunk in iter(lambda: body.read(STREAM_CHUNK_BYTES), b''):
+                buffer.write(chunk)
+            buffer.seek(0)
+            return pd.read_csv(buffer, usecols=columns, low_memory=False)
+
+    def download_many(self, s3_keys: list, use_cache: bool = True) -> dict:
+        """
+        Download several files concurrently and map each key to its DataFrame.
+        Keys that fail to load map to None.
+        """
+        return self._map_parallel(lambda key: self.download_file(key, use_cache=use_cache), s3_keys)
+
+    def _map_parallel(self, fn, s3_keys: list) -> dict:
+        """
+        Apply fn to each key on a thread pool and map each key to its result.
+        S3 reads are latency-bound and release the GIL while waiting on sockets,
+        so per-file round trips overlap instead of queueing behind one another.
+        Worker threads inherit the script run context so Streamlit caches and
+        session state stay usable inside fn.
+        """
+        if not s3_keys:
+            return {}
+
+        results = {}
+        with ThreadPoolExecutor(
+            max_workers=min(S3_DOWNLOAD_WORKERS, len(s3_keys)),
+            initializer=add_script_run_ctx,
+            initargs=(None, get_script_run_ctx())
+        ) as executor:
+            futures = {executor.submit(fn, key): key for key in s3_keys}
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    results[key] = future.result()
+                except Exception as e:
+                    print(f"Error loading {key}: {e}")
+                    results[key] = None
+        return results
+
+    def iter_files(self, prefix: str = ""):
+        """Lazily yield file keys in S3 bucket with given prefix, across all pages."""
+        if not self.is_configured():
+            return
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            for obj in page.get('Contents', []):
+                yield obj['Key']
+
+    def list_file_etags(self, prefix: str = "") -> dict:
+        """Map file keys with given prefix to their ETags (metadata only, no downloads)."""
+        if not self.is_configured():
+            return {}
+        try:
+            paginator = self.s3_client.get_paginator('list_objects_v2')
+            return {
+                obj['Key']: obj['ETag']
+                for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix)
+                for obj in page.get('Contents', [])
+            }
+        except ClientError as e:
+            st.error(f"List failed: {e}")
+            return {}
+
     def list_files(self, prefix: str = "") -> list:
         """List files in S3 bucket with given prefix."""
-        if not self.is_configured():
-            return []
         try:
-            response = self.s3_client.list_objects_v2(Bucket=self.bucket_name, Prefix=prefix)
-            return [obj['Key'] for obj in response.get('Contents', [])]
+            return list(self.iter_files(prefix))
         except ClientError as e:
             st.error(f"List failed: {e}")
             return []
     
     def save_processed_data(self, df: pd.DataFrame, data_type: str, store: str = "combined") -> tuple[bool, str]:
-        """Save processed data to S3."""
+        """Save processed data to S3 as Parquet + Snappy (or CSV when LEGACY_CSV is set)."""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        s3_key = f"processed/{store}/{data_type}_{timestamp}.csv"
+        extension = "csv" if LEGACY_CSV else "parquet"
+        s3_key = f"processed/{store}/{data_type}_{timestamp}.{extension}"
         
         buffer = io.BytesIO()
-        df.to_csv(buffer, index=False)
+        if LEGACY_CSV:
+            df.to_csv(buffer, index=False)
+        else:
+            df.to_parquet(buffer, engine='pyarrow', compression='snappy', index=False)
         buffer.seek(0)
         
         return self.upload_file(buffer, s3_key)
-    
+
     def save_brand_product_mapping(self, mapping: dict) -> tuple[bool, str]:
         """Save brand-product mapping to S3."""
         if not self.is_configured():
@@ -2432,8 +2670,13 @@ class S3DataManager:
         
         try:
             mapping_json = json.dumps(mapping, indent=2)
-            buffer = io.BytesIO(mapping_json.encode('utf-8'))
-            self.s3_client.upload_fileobj(buffer, self.bucket_name, s3_key)
+            # A few KB of JSON: one PutObject, without spinning up the transfer manager's threads
+            self.s3_client.put_object(
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                Body=mapping_json.encode('utf-8'),
+                ContentType='application/json'
+            )
             return True, f"Saved mapping to s3://{self.bucket_name}/{s3_key}"
         except ClientError as e:
             error_msg = e.response.get('Error', {}).get('Message', str(e))
@@ -2540,56 +2783,70 @@ class S3DataManager:
         
         try:
             # List all files in raw-uploads
-            files = self.list_files(prefix="raw-uploads/")
+            file_etags = self.list_file_etags(prefix="raw-uploads/")
+            files = list(file_etags)
             
             if not files:
                 return result
             
-            # Group files by type
-            sales_files = [f for f in files if '/sales_' in f and f.endswith('.csv')]
-            brand_files = [f for f in files if '/brand_' in f and f.endswith('.csv')]
-            product_files = [f for f in files if '/product_' in f and f.endswith('.csv')]
-            customer_files = [f for f in files if '/customers_' in f and f.endswith('.csv')]
-            invoice_files = [f for f in files if '/invoices_' in f and f.endswith('.csv')]
-            budtender_files = [f for f in files if '/budtender_' in f and f.endswith('.csv')]
+            # Group files by type in one pass, keyed on the filename's type prefix
+            files_by_kind = {kind: [] for kind in ('sales', 'brand', 'product', 'customers', 'invoices', 'budtender')}
+            for f in files:
+                if f.endswith('.csv'):
+                    kind = f.rsplit('/', 1)[-1].split('_', 1)[0]
+                    if kind in files_by_kind:
+                        files_by_kind[kind].append(f)
+            sales_files = files_by_kind['sales']
+            brand_files = files_by_kind['brand']
+            product_files = files_by_kind['product']
+            customer_files = files_by_kind['customers']
+            invoice_files = files_by_kind['invoices']
+            budtender_files = files_by_kind['budtender']
+
+            # Download and clean every typed file concurrently up front
+            clean_methods = {
+                **{f: 'clean_sales_by_store' for f in sales_files},
+                **{f: 'clean_brand_data' for f in brand_files},
+                **{f: 'clean_product_data' for f in product_files},
+                **{f: 'clean_customer_data' for f in customer_files},
+                **{f: 'clean_invoice_data' for f in invoice_files},
+            }
+            cleaned = self._map_parallel(
+                lambda f: self._load_cleaned_file(f, file_etags.get(f, ''), clean_methods[f], processor),
+                list(clean_methods)
+            )
             
             # Load and merge sales data
             if sales_files:
                 sales_dfs = []
                 for f in sales_files:
                     try:
-                        df = self.download_file(f)
+                        df = cleaned.get(f)
                         if df is not None and not df.empty:
                             # Extract store from path
                             store_id = self._extract_store_from_path(f)
-                            df = processor.clean_sales_by_store(df)
                             if store_id and store_id != 'combined':
-                                df['Upload_Store'] = store_id
+                                df['Upload_Store'] = pd.Series(store_id, index=df.index, dtype=UPLOAD_STORE_DTYPE)
                             sales_dfs.append(df)
                     except Exception as e:
                         print(f"Error loading {f}: {e}")
                         continue
                 
                 if sales_dfs:
-                    result['sales'] = pd.concat(sales_dfs, ignore_index=True)
                     # Remove duplicates based on Store and Date
-                    result['sales'] = result['sales'].drop_duplicates(
-                        subset=['Store', 'Date'], 
-                        keep='last'
-                    )
+                    result['sales'] = self._concat_keep_last(sales_dfs, ['Store', 'Date'])
             
             # Load and merge brand data
             if brand_files:
                 brand_dfs = []
                 for f in brand_files:
                     try:
-                        df = self.download_file(f)
+                        df = cleaned.get(f)
                         if df is not None and not df.empty:
                             store_id = self._extract_store_from_path(f)
                             date_range = self._extract_date_range_from_path(f)
                             
-                            df = processor.clean_brand_data(df)
-                            df['Upload_Store'] = store_id
+                            df['Upload_Store'] = pd.Series(store_id, index=df.index, dtype=UPLOAD_STORE_DTYPE)
                             
                             if date_range:
                                 df['Upload_Start_Date'] = pd.to_datetime(date_range[0])
@@ -2601,26 +2858,22 @@ class S3DataManager:
                         continue
                 
                 if brand_dfs:
-                    result['brand'] = pd.concat(brand_dfs, ignore_index=True)
                     # Remove duplicates
-                    if 'Upload_Start_Date' in result['brand'].columns:
-                        result['brand'] = result['brand'].drop_duplicates(
-                            subset=['Brand', 'Upload_Store', 'Upload_Start_Date'], 
-                            keep='last'
-                        )
+                    result['brand'] = self._concat_keep_last(
+                        brand_dfs, ['Brand', 'Upload_Store', 'Upload_Start_Date']
+                    )
             
             # Load and merge product data
             if product_files:
                 product_dfs = []
                 for f in product_files:
                     try:
-                        df = self.download_file(f)
+                        df = cleaned.get(f)
                         if df is not None and not df.empty:
                             store_id = self._extract_store_from_path(f)
                             date_range = self._extract_date_range_from_path(f)
                             
-                            df = processor.clean_product_data(df)
-                            df['Upload_Store'] = store_id
+                            df['Upload_Store'] = pd.Series(store_id, index=df.index, dtype=UPLOAD_STORE_DTYPE)
                             
                             if date_range:
                                 df['Upload_Start_Date'] = pd.to_datetime(date_range[0])
@@ -2632,25 +2885,21 @@ class S3DataManager:
                         continue
                 
                 if product_dfs:
-                    result['product'] = pd.concat(product_dfs, ignore_index=True)
                     # Remove duplicates
-                    if 'Upload_Start_Date' in result['product'].columns:
-                        result['product'] = result['product'].drop_duplicates(
-                            subset=['Product Type', 'Upload_Store', 'Upload_Start_Date'],
-                            keep='last'
-                        )
+                    result['product'] = self._concat_keep_last(
+                        product_dfs, ['Product Type', 'Upload_Store', 'Upload_Start_Date']
+                    )
 
             # Load and merge customer data
             if customer_files:
                 customer_dfs = []
                 for f in customer_files:
                     try:
-                        df = self.download_file(f)
+                        df = cleaned.get(f)
                         if df is not None and not df.empty:
                             store_id = self._extract_store_from_path(f)
 
-                            df = processor.clean_customer_data(df)
-                            df['Upload_Store'] = store_id
+                            df['Upload_Store'] = pd.Series(store_id, index=df.index, dtype=UPLOAD_STORE_DTYPE)
                             df['Upload_Date'] = pd.to_datetime(datetime.now())
 
                             customer_dfs.append(df)
@@ -2673,13 +2922,12 @@ class S3DataManager:
                 invoice_dfs = []
                 for f in invoice_files:
                     try:
-                        df = self.download_file(f)
+                        df = cleaned.get(f)
                         if df is not None and not df.empty:
                             store_id = self._extract_store_from_path(f)
                             date_range = self._extract_date_range_from_path(f)
 
-                            df = processor.clean_invoice_data(df)
-                            df['Upload_Store'] = store_id
+                            df['Upload_Store'] = pd.Series(store_id, index=df.index, dtype=UPLOAD_STORE_DTYPE)
 
                             if date_range:
                                 df['Upload_Start_Date'] = pd.to_datetime(date_range[0])
@@ -2704,9 +2952,10 @@ class S3DataManager:
 
             # First check for budtender files in raw-uploads
             if budtender_files:
+                budtender_downloads = self.download_many(budtender_files)
                 for f in budtender_files:
                     try:
-                        df = self.download_file(f)
+                        df = budtender_downloads.get(f)
                         if df is not None and not df.empty:
                             store_id = self._extract_store_from_path(f)
                             df['Store_ID'] = store_id
@@ -2741,6 +2990,34 @@ class S3DataManager:
 
         return result
     
+    def _load_cleaned_file(self, s3_key: str, etag: str, clean_method: str, processor) -> pd.DataFrame:
+        """Download and clean a file, reusing the cached result while its ETag is unchanged."""
+        return _load_cleaned_s3_file(self.bucket_name, s3_key, etag, clean_method, self, processor)
+
+    @staticmethod
+    def _concat_keep_last(frames: list, key_cols: list) -> pd.DataFrame:
+        """
+        Concatenate per-file frames keeping only the last row per key, like
+        concat + drop_duplicates(keep='last'), but superseded rows are dropped
+        from each file before the wide concat so they are never copied.
+        Frames are left undeduplicated when none of them carries the key columns.
+        """
+        has_keys = [set(key_cols).issubset(frame.columns) for frame in frames]
+        if not any(has_keys):
+            return pd.concat(frames, ignore_index=True)
+        if not all(has_keys):
+            return pd.concat(frames, ignore_index=True).drop_duplicates(subset=key_cols, keep='last')
+
+        # Resolve duplicates on the narrow key columns only, then split the mask per file
+        keys = pd.concat([frame[key_cols] for frame in frames], ignore_index=True)
+        superseded = keys.duplicated(keep='last').to_numpy()
+        kept, start = [], 0
+        for frame in frames:
+            end = start + len(frame)
+            kept.append(frame[~superseded[start:end]])
+            start = end
+        return pd.concat(kept, ignore_index=True)
+
     def _extract_store_from_path(self, path: str) -> str:
         """Extract store ID from S3 file path."""
         # Path format: raw-uploads/{store_id}/type_daterange_timestamp.csv
@@ -2751,18 +3028,15 @@ class S3DataManager:
     
     def _extract_date_range_from_path(self, path: str) -> tuple:
         """Extract date range from S3 file path."""
-        # Filename format: type_YYYYMMDD-YYYYMMDD_timestamp.csv
-        import re
-        
         filename = path.split('/')[-1]
-        match = re.search(r'_(\d{8})-(\d{8})_', filename)
-        
+        match = UPLOAD_DATE_RANGE_RE.search(filename)
+
         if match:
-            start_str = match.group(1)
-            end_str = match.group(2)
             try:
-                start_date = datetime.strptime(start_str, '%Y%m%d')
-                end_date = datetime.strptime(end_str, '%Y%m%d')
+                # Fixed-width YYYYMMDD, so slice instead of running strptime
+                start_date, end_date = (
+                    datetime(int(s[:4]), int(s[4:6]), int(s[6:8])) for s in match.groups()
+                )
                 return (start_date, end_date)
             except ValueError:
                 pass
@@ -2774,21 +3048,128 @@ class S3DataManager:
 # DATA PROCESSING
 # =============================================================================
 
+# Store_ID has a fixed vocabulary, so a shared categorical dtype keeps the
+# int8 codes intact when frames from several uploads are concatenated
+STORE_ID_DTYPE = pd.CategoricalDtype(['barbary_coast', 'grass_roots'])
+
+# Upload_Store also records uploads tagged as covering both stores
+UPLOAD_STORE_DTYPE = pd.CategoricalDtype([*STORE_ID_DTYPE.categories, 'combined'])
+
+# Date layouts seen in POS exports, tried in order against a sample value
+POS_DATE_FORMATS = ('%Y-%m-%d', '%m/%d/%Y', '%Y-%m-%d %H:%M:%S')
+
+# Sales columns narrowed after cleaning: small counts fit int32 and bounded
+# ratios need no more than float32. Currency columns stay float64.
+SALES_COUNT_COLUMNS = ['Tickets Count', 'Units Sold', 'Customers Count', 'New Customers']
+SALES_RATIO_COLUMNS = ['Gross Margin %', 'Discount %', 'Cost %']
+
+# Brand ratio columns (0-1) are narrowed the same way; brand currency stays float64
+BRAND_RATIO_COLUMNS = ['% of Total Net Sales', 'Gross Margin %']
+
+# Cleaned sales frames store SALES_RATIO_COLUMNS as percentages (0-100), not
+# the 0-1 ratios found in the POS export. Brand frames keep raw ratios.
+SALES_RATIO_SCALE = 100
+
+# Weekday labels in dt.dayofweek order (Monday=0)
+DAY_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
 class DataProcessor:
     """Processes and cleans uploaded CSV data."""
+
+    @staticmethod
+    def _coerce_numeric(df: pd.DataFrame, numeric_cols: list) -> pd.DataFrame:
+        """
+        Coerce the given columns to numeric in a single batched call.
+        Columns that are missing or already numeric (e.g. typed by the Arrow
+        reader) are skipped.
+        """
+        to_convert = [
+            col for col in numeric_cols
+            if col in df.columns and not pd.api.types.is_numeric_dtype(df[col])
+        ]
+        if to_convert:
+            df[to_convert] = df[to_convert].apply(pd.to_numeric, errors='coerce')
+        return df
+
+    @staticmethod
+    def _compact_dtypes(df: pd.DataFrame, category_cols: tuple = (), string_cols: tuple = ()) -> pd.DataFrame:
+        """
+        Store low-cardinality labels as category codes and free-text labels
+        as Arrow-backed strings. Missing columns are skipped.
+        """
+        for col in category_cols:
+            if col in df.columns:
+                df[col] = df[col].astype('category')
+        for col in string_cols:
+            if col in df.columns:
+                df[col] = df[col].astype('string[pyarrow]')
+        return df
+
+    @staticmethod
+    def _downcast_numeric(df: pd.DataFrame, int_cols: list, float_cols: list) -> pd.DataFrame:
+        """
+        Narrow numeric columns to 32-bit dtypes. Count columns with gaps or
+        fractional values become float32 rather than a nullable integer.
+        """
+        for col in int_cols:
+            if col in df.columns:
+                values = df[col]
+                whole = values.notna().all() and (values % 1 == 0).all()
+                df[col] = values.astype('int32' if whole else 'float32')
+        float_cols = [col for col in float_cols if col in df.columns]
+        if float_cols:
+            df[float_cols] = df[float_cols].astype('float32')
+        return df
+
+    @staticmethod
+    def _parse_dates(values: pd.Series) -> pd.Series:
+        """
+        Parse a date column with one explicit format picked from its first
+        non-null value, keeping pandas on the C strptime path. Columns the
+        Arrow reader already typed as timestamps pass through unchanged.
+        """
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return values
+
+        non_null = values.dropna()
+        sample = str(non_null.iloc[0]).strip() if len(non_null) else None
+        for fmt in POS_DATE_FORMATS:
+            try:
+                datetime.strptime(sample, fmt)
+            except (TypeError, ValueError):
+                continue
+            return pd.to_datetime(values, format=fmt, errors='raise', cache=True)
+
+        return pd.to_datetime(values, errors='raise', cache=True)
+
+    @staticmethod
+    def _sample_mask(brands: pd.Series) -> np.ndarray:
+        """
+        Boolean mask of sample records ([DS]/[SS] brand prefixes).
+        Evaluated with Arrow compute kernels over a contiguous string buffer.
+        """
+        arrow_brands = pa.array(brands.astype('string').to_numpy(na_value=''), type=pa.string())
+        is_sample = reduce(pc.or_, (pc.starts_with(arrow_brands, prefix) for prefix in SAMPLE_PREFIXES))
+        return is_sample.to_numpy(zero_copy_only=False)
     
     @staticmethod
     def clean_sales_by_store(df: pd.DataFrame) -> pd.DataFrame:
         """Clean and process Sales by Store data."""
-        df = df.copy()
-        
-        # Convert date columns
-        df['Date'] = pd.to_datetime(df['Date'])
-        df['Week'] = pd.to_datetime(df['Week'])
+        # Convert date columns; assign builds a new frame so the caller's is untouched
+        df = df.assign(
+            Date=DataProcessor._parse_dates(df['Date']),
+            Week=DataProcessor._parse_dates(df['Week'])
+        )
         
+        # Weekday as ordered category codes, derived once here instead of per render
+        day_codes = df['Date'].dt.dayofweek.fillna(-1).astype('int8')
+        df['Day_of_Week'] = pd.Categorical.from_codes(day_codes, categories=DAY_ORDER, ordered=True)
+
         # Extract store identifier
-        df['Store_ID'] = df['Store'].apply(lambda x: 
-            'grass_roots' if 'Grass Roots' in str(x) else 'barbary_coast'
+        is_grass_roots = df['Store'].astype('string').str.contains('Grass Roots', regex=False, na=False)
+        df['Store_ID'] = pd.Categorical(
+            np.where(is_grass_roots, 'grass_roots', 'barbary_coast'), dtype=STORE_ID_DTYPE
         )
         
         # Ensure numeric columns
@@ -2798,62 +3179,63 @@ class DataProcessor:
                        'Gross Margin %', 'Discount %', 'Cost %',
                        'Avg Basket Size', 'Avg Order Value', 'Avg Order Profit']
         
-        for col in numeric_cols:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
+        df = DataProcessor._coerce_numeric(df, numeric_cols)
+        df = DataProcessor._downcast_numeric(df, SALES_COUNT_COLUMNS, SALES_RATIO_COLUMNS)
+
+        # Scale ratios to percentages once so consumers read them directly
+        ratio_cols = [col for col in SALES_RATIO_COLUMNS if col in df.columns]
+        df[ratio_cols] = (df[ratio_cols] * SALES_RATIO_SCALE).astype('float32')
+        df = DataProcessor._compact_dtypes(df, category_cols=('Store',))
         
         return df.sort_values('Date')
     
     @staticmethod
     def clean_brand_data(df: pd.DataFrame) -> pd.DataFrame:
         """Clean and process Net Sales by Brand data."""
-        df = df.copy()
-
         # Handle column name change: Treez renamed 'Brand' to 'Product Brand' after 12/01/2025
         if 'Product Brand' in df.columns and 'Brand' not in df.columns:
             df = df.rename(columns={'Product Brand': 'Brand'})
 
+        # Clean brand name once; the sample filter below reads the same stripped values
+        brand_clean = df['Brand'].str.strip()
+
         # Filter out sample records ([DS] = Display Samples, [SS] = Staff Samples)
         # These are not actual sales and should be excluded from analysis
-        original_count = len(df)
-        df = df[~df['Brand'].str.startswith(('[DS]', '[SS]'), na=False)]
-        filtered_count = original_count - len(df)
-        
+        is_sample = DataProcessor._sample_mask(brand_clean)
+        df = df[~is_sample].assign(Brand_Clean=brand_clean[~is_sample])
+
+        filtered_count = int(is_sample.sum())
         if filtered_count > 0:
             print(f"Filtered out {filtered_count} sample records ([DS]/[SS])")
         
-        # Clean brand name (remove any remaining prefixes like numbers in parentheses)
-        df['Brand_Clean'] = df['Brand'].str.strip()
-        
         # Ensure numeric columns
         numeric_cols = ['% of Total Net Sales', 'Gross Margin %', 'Avg Cost (w/o excise)', 'Net Sales']
-        for col in numeric_cols:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
+        df = DataProcessor._coerce_numeric(df, numeric_cols)
         
         # Filter out rows with zero or negative net sales (likely adjustments/corrections)
         df = df[df['Net Sales'] > 0]
+        df = DataProcessor._downcast_numeric(df, [], BRAND_RATIO_COLUMNS)
+        df = DataProcessor._compact_dtypes(df, string_cols=('Brand', 'Brand_Clean'))
         
         return df
     
     @staticmethod
     def clean_product_data(df: pd.DataFrame) -> pd.DataFrame:
         """Clean and process Net Sales by Product data."""
-        df = df.copy()
-        df['Net Sales'] = pd.to_numeric(df['Net Sales'], errors='coerce')
+        df = df.assign(**{'Net Sales': pd.to_numeric(df['Net Sales'], errors='coerce')})
+        df = DataProcessor._compact_dtypes(df, category_cols=('Product Type',))
         return df.sort_values('Net Sales', ascending=False)
 
     @staticmethod
     def clean_customer_data(df: pd.DataFrame) -> pd.DataFrame:
         """Clean and process customer data."""
-        df = df.copy()
-
-        # Remove BOM if present
-        df.columns = [col.strip().replace('\ufeff', '') for col in df.columns]
+        # Remove BOM if present (rename returns a new frame; the caller's is untouched)
+        df = df.rename(columns=lambda col: col.strip().replace('\ufeff', ''))
 
         # Extract store identifier
-        df['Store_ID'] = df['Store Name'].apply(lambda x:
-            'grass_roots' if 'Grass Roots' in str(x) else 'barbary_coast'
+        is_grass_roots = df['Store Name'].astype('string').str.contains('Grass Roots', regex=False, na=False)
+        df['Store_ID'] = pd.Categorical(
+            np.where(is_grass_roots, 'grass_roots', 'barbary_coast'), dtype=STORE_ID_DTYPE
         )
 
         # Convert date columns
@@ -2880,9 +3262,7 @@ class DataProcessor:
                        'Lifetime Discounts', 'Lifetime Avg Order Value',
                        'Rewards Points Balance', 'Reward Points ($) Balance']
 
-        for col in numeric_cols:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
+        df = DataProcessor._coerce_numeric(df, numeric_cols)
 
         # Create customer segments based on lifetime value
         df['Customer Segment'] = pd.cut(
@@ -2906,10 +3286,8 @@ class DataProcessor:
     @staticmethod
     def clean_invoice_data(df: pd.DataFrame) -> pd.DataFrame:
         """Clean and process invoice/purchase order data."""
-        df = df.copy()
-
-        # Remove BOM if present
-        df.columns = [col.strip().replace('\ufeff', '') for col in df.columns]
+        # Remove BOM if present (rename returns a new frame; the caller's is untouched)
+        df = df.rename(columns=lambda col: col.strip().replace('\ufeff', ''))
 
         # Convert date columns if present
         date_cols = ['Invoice Date', 'Order Date', 'Delivery Date', 'Due Date']
@@ -2939,47 +3317,57 @@ class AnalyticsEngine:
     
     @staticmethod
     def calculate_store_metrics(df: pd.DataFrame) -> dict:
-        """Calculate key metrics by store."""
-        metrics = {}
-        
-        for store_id in df['Store_ID'].unique():
-            store_df = df[df['Store_ID'] == store_id]
-            store_name = STORE_DISPLAY_NAMES.get(store_id, store_id)
-            
-            metrics[store_name] = {
-                'total_net_sales': store_df['Net Sales'].sum(),
-                'total_transactions': store_df['Tickets Count'].sum(),
-                'total_customers': store_df['Customers Count'].sum(),
-                'total_new_customers': store_df['New Customers'].sum(),
-                'avg_order_value': store_df['Avg Order Value'].mean(),
-                'avg_margin': store_df['Gross Margin %'].mean() * 100,
-                'avg_discount_rate': store_df['Discount %'].mean() * 100,
-                'units_sold': store_df['Units Sold'].sum(),
-            }
-        
-        return metrics
+        """Calculate key metrics by store in a single grouped reduction."""
+        grouped = df.groupby('Store_ID', sort=False, observed=True).agg(
+            total_net_sales=('Net Sales', 'sum'),
+            total_transactions=('Tickets Count', 'sum'),
+            total_customers=('Customers Count', 'sum'),
+            total_new_customers=('New Customers', 'sum'),
+            avg_order_value=('Avg Order Value', 'mean'),
+            avg_margin=('Gross Margin %', 'mean'),
+            avg_discount_rate=('Discount %', 'mean'),
+            units_sold=('Units Sold', 'sum'),
+        )
+
+        return {
+            STORE_DISPLAY_NAMES.get(store_id, store_id): store_metrics
+            for store_id, store_metrics in grouped.to_dict('index').items()
+        }
+    
+    @staticmethod
+    @st.cache_data(ttl=3600, show_spinner=False)
+    def brand_summary(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Reduce brand rows to the ranking columns, sorted once by Net Sales.
+        Upload_Store is used as Store_ID when the frame has no Store_ID.
+        """
+        store_col = next((col for col in ('Store_ID', 'Upload_Store') if col in df.columns), None)
+        cols = ['Brand', 'Net Sales', 'Gross Margin %', '% of Total Net Sales']
+        summary = df[cols + [store_col]] if store_col else df[cols]
+        if store_col == 'Upload_Store':
+            summary = summary.rename(columns={'Upload_Store': 'Store_ID'})
+        # Stable sort keeps nlargest's first-seen order for tied sales
+        return summary.sort_values('Net Sales', ascending=False, kind='stable', ignore_index=True)
     
     @staticmethod
     def identify_top_brands(df: pd.DataFrame, n: int = 10, store: str = None) -> pd.DataFrame:
         """Identify top performing brands."""
+        summary = AnalyticsEngine.brand_summary(df)
         if store and store != 'All Stores':
-            store_id = [k for k, v in STORE_DISPLAY_NAMES.items() if v == store]
-            if store_id:
-                # Check for Store_ID first, then Upload_Store
-                if 'Store_ID' in df.columns:
-                    df = df[df['Store_ID'] == store_id[0]]
-                elif 'Upload_Store' in df.columns:
-                    df = df[df['Upload_Store'] == store_id[0]]
+            store_id = STORE_ID_BY_DISPLAY.get(store)
+            if store_id and 'Store_ID' in summary.columns:
+                summary = summary[summary['Store_ID'] == store_id]
         
-        return df.nlargest(n, 'Net Sales')[['Brand', 'Net Sales', 'Gross Margin %', '% of Total Net Sales']]
+        return summary.head(n)[['Brand', 'Net Sales', 'Gross Margin %', '% of Total Net Sales']]
     
     @staticmethod
     def identify_underperformers(df: pd.DataFrame, margin_threshold: float = 0.4) -> pd.DataFrame:
         """Identify brands with low margins that might need attention."""
-        low_margin = df[
-            (df['Gross Margin %'] < margin_threshold) & 
-            (df['Net Sales'] > 1000)  # Only significant sellers
-        ].copy()
+        summary = AnalyticsEngine.brand_summary(df)
+        low_margin = summary[
+            (summary['Gross Margin %'] < margin_threshold) & 
+            (summary['Net Sales'] > 1000)  # Only significant sellers
+        ]
         
         return low_margin.nsmallest(10, 'Gross Margin %')[['Brand', 'Net Sales', 'Gross Margin %']]
     
@@ -3032,9 +3420,10 @@ class AnalyticsEngine:
         # Brand recommendations
         if brand_df is not None and len(brand_df) > 0:
             # High margin opportunities
-            high_margin_low_sales = brand_df[
-                (brand_df['Gross Margin %'] > 0.65) & 
-                (brand_df['% of Total Net Sales'] < 0.01)
+            summary = AnalyticsEngine.brand_summary(brand_df)
+            high_margin_low_sales = summary[
+                (summary['Gross Margin %'] > 0.65) & 
+                (summary['% of Total Net Sales'] < 0.01)
             ].head(5)
             
             if len(high_margin_low_sales) > 0:
@@ -3053,12 +3442,62 @@ class AnalyticsEngine:
 # VISUALIZATION COMPONENTS
 # =============================================================================
 
+# Above this many points per trace, trend lines are drawn without markers
+TREND_MARKER_MAX_POINTS = 1000
+
+# Time-series traces are downsampled (LTTB) to at most this many points
+PLOT_MAX_POINTS = 2000
+
+# Raw data tables ship at most this many rows to the browser
+RAW_DATA_MAX_ROWS = 10_000
+
+
+def _lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: pick n_out point indices that preserve the
+    visual shape of (x, y). The first and last points are always kept.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    anchor = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs(
+            (x[anchor] - avg_x) * (y[start:end] - y[anchor])
+            - (x[anchor] - x[start:end]) * (avg_y - y[anchor])
+        )
+        anchor = start + int(np.argmax(area))
+        keep[i + 1] = anchor
+    return keep
+
+
+def _downsample_trace(x: pd.Series, y: pd.Series, max_points: int = PLOT_MAX_POINTS) -> tuple:
+    """Reduce an x-sorted series to at most max_points with LTTB before plotting."""
+    if len(y) <= max_points:
+        return x, y
+    if pd.api.types.is_datetime64_any_dtype(x):
+        x_num = x.to_numpy(dtype='datetime64[ns]').astype(np.int64).astype(np.float64)
+    else:
+        x_num = x.to_numpy(dtype=np.float64)
+    y_num = np.nan_to_num(y.to_numpy(dtype=np.float64))
+    keep = _lttb_indices(x_num, y_num, max_points)
+    return x.iloc[keep], y.iloc[keep]
+
+
 def plot_sales_trend(df: pd.DataFrame, store_filter: str = "All Stores"):
     """Create sales trend visualization with Chapters theme."""
     if store_filter != "All Stores":
-        store_id = [k for k, v in STORE_DISPLAY_NAMES.items() if v == store_filter]
+        store_id = STORE_ID_BY_DISPLAY.get(store_filter)
         if store_id:
-            df = df[df['Store_ID'] == store_id[0]]
+            df = df[df['Store_ID'] == store_id]
 
     # Filter out invalid data points (zero, null, or suspiciously low values)
     df = df[
@@ -3072,19 +3511,24 @@ def plot_sales_trend(df: pd.DataFrame, store_filter: str = "All Stores"):
                         subplot_titles=('Net Sales by Day', 'Transaction Count'),
                         vertical_spacing=0.1)
 
-    colors = get_chapters_line_colors(len(df['Store_ID'].unique()) * 2)
+    colors = get_chapters_line_colors(df['Store_ID'].nunique() * 2)
     color_idx = 0
 
-    for store_id in df['Store_ID'].unique():
-        store_df = df[df['Store_ID'] == store_id]
+    # Sort once globally so each group is already in date order
+    df = df.sort_values('Date')
+
+    for store_id, store_df in df.groupby('Store_ID', sort=False, observed=True):
         store_name = STORE_DISPLAY_NAMES.get(store_id, store_id)
+        trace_mode = 'lines+markers' if len(store_df) <= TREND_MARKER_MAX_POINTS else 'lines'
+        sales_x, sales_y = _downsample_trace(store_df['Date'], store_df['Net Sales'])
+        tickets_x, tickets_y = _downsample_trace(store_df['Date'], store_df['Tickets Count'])
 
         fig.add_trace(
-            go.Scatter(
-                x=store_df['Date'],
-                y=store_df['Net Sales'],
+            go.Scattergl(
+                x=sales_x,
+                y=sales_y,
                 name=f'{store_name} Sales',
-                mode='lines+markers',
+                mode=trace_mode,
                 line=dict(color=colors[color_idx % len(colors)], width=2),
                 marker=dict(size=6)
             ),
@@ -3093,11 +3537,11 @@ def plot_sales_trend(df: pd.DataFrame, store_filter: str = "All Stores"):
         color_idx += 1
 
         fig.add_trace(
-            go.Scatter(
-                x=store_df['Date'],
-                y=store_df['Tickets Count'],
+            go.Scattergl(
+                x=tickets_x,
+                y=tickets_y,
                 name=f'{store_name} Transactions',
-                mode='lines+markers',
+                mode=trace_mode,
                 line=dict(color=colors[color_idx % len(colors)], width=2),
                 marker=dict(size=6)
             ),
@@ -3237,40 +3681,32 @@ def plot_brand_performance(df: pd.DataFrame, top_n: int = 15):
     return apply_chapters_theme(fig)
 
 
-def plot_store_comparison(metrics: dict):
-    """Create store comparison dashboard with Chapters theme."""
-    stores = list(metrics.keys())
-
-    comparison_data = {
-        'Metric': ['Net Sales', 'Transactions', 'Avg Order Value', 'Gross Margin %', 'Units Sold'],
-    }
-
-    for store in stores:
-        comparison_data[store] = [
-            metrics[store]['total_net_sales'],
-            metrics[store]['total_transactions'],
-            metrics[store]['avg_order_value'],
-            metrics[store]['avg_margin'],
-            metrics[store]['units_sold']
-        ]
+def plot_store_comparison(metrics_df: pd.DataFrame):
+    """
+    Create store comparison dashboard with Chapters theme.
+    metrics_df holds one row per store (display name index), as built from
+    AnalyticsEngine.calculate_store_metrics.
+    """
+    stores = metrics_df.index.tolist()
+    metric_labels = ['Net Sales', 'Transactions', 'Avg Order Value', 'Gross Margin %', 'Units Sold']
+    metric_cols = ['total_net_sales', 'total_transactions', 'avg_order_value', 'avg_margin', 'units_sold']
 
     fig = go.Figure()
 
     # Get Chapters colors for each store
     colors = get_chapters_line_colors(len(stores))
 
-    # Normalized comparison
-    for idx, store in enumerate(stores):
-        # Normalize for radar chart
-        values = comparison_data[store]
-        max_vals = [max(comparison_data[s][i] for s in stores) for i in range(len(values))]
-        normalized = [v / m * 100 if m > 0 else 0 for v, m in zip(values, max_vals)]
-        normalized.append(normalized[0])  # Close the polygon
+    # Normalize each metric against its max across stores for the radar chart
+    values = metrics_df[metric_cols].to_numpy(dtype=np.float64)
+    col_max = values.max(axis=0) if len(stores) else np.zeros(len(metric_cols))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        normalized = np.where(col_max > 0, values / col_max * 100.0, 0.0)
 
-        categories = comparison_data['Metric'] + [comparison_data['Metric'][0]]
+    categories = metric_labels + [metric_labels[0]]
 
+    for idx, store in enumerate(stores):
         fig.add_trace(go.Scatterpolar(
-            r=normalized,
+            r=np.append(normalized[idx], normalized[idx, 0]),  # Close the polygon
             theta=categories,
             fill='toself',
             name=store,
@@ -3430,17 +3866,14 @@ def _get_dynamodb_hash(_aws_access_key: str, _aws_secret_key: str, _region: str)
         return ""
 
 
-def _get_cached_s3_data(data_hash: str, s3_manager, processor) -> dict:
+@st.cache_data(ttl=86400, show_spinner=False)  # Cache for 24 hours (use manual refresh for immediate updates)
+def _get_cached_s3_data(data_hash: str, _s3_manager, _processor) -> dict:
     """
     Load S3 data with caching. The data_hash parameter ensures cache invalidation
     when data changes. Streamlit's cache_data will return cached result if
-    the hash hasn't changed.
+    the hash hasn't changed. The manager and processor are not hashed.
     """
-    @st.cache_data(ttl=86400, show_spinner=False)  # Cache for 24 hours (use manual refresh for immediate updates)
-    def _load_s3_data(_hash: str) -> dict:
-        return s3_manager.load_all_data_from_s3(processor)
-
-    return _load_s3_data(data_hash)
+    return _s3_manager.load_all_data_from_s3(_processor)
 
 
 @st.cache_data(ttl=3600, show_spinner=False)  # 1-hour cache for DynamoDB data
@@ -3484,13 +3917,10 @@ def _get_cached_dynamodb_data(_data_hash: str, _aws_access_key: str, _aws_secret
         return None
 
 
-def _get_cached_brand_mapping(data_hash: str, s3_manager) -> dict:
+@st.cache_data(ttl=86400, show_spinner=False)  # Cache for 24 hours
+def _get_cached_brand_mapping(data_hash: str, _s3_manager) -> dict:
     """Load brand mapping with cache invalidation based on S3 hash."""
-    @st.cache_data(ttl=86400, show_spinner=False)  # Cache for 24 hours
-    def _load_mapping(_hash: str) -> dict:
-        return s3_manager.load_brand_product_mapping()
-
-    return _load_mapping(data_hash)
+    return _s3_manager.load_brand_product_mapping()
 
 
 def _clear_all_data_caches():
@@ -3512,6 +3942,18 @@ def _clear_all_data_caches():
         _get_cached_dynamodb_data.clear()
     except:
         pass
+    try:
+        _load_cleaned_s3_file.clear()
+    except:
+        pass
+    try:
+        _get_cached_s3_data.clear()
+    except:
+        pass
+    try:
+        _get_cached_brand_mapping.clear()
+    except:
+        pass
 
     # Clear unified cache manager if available
     try:
@@ -3554,6 +3996,21 @@ def _clear_all_data_caches():
 # MAIN APPLICATION
 # =============================================================================
 
+@st.cache_resource
+def _get_services():
+    """Create the S3 manager, data processor and analytics engine once per process."""
+    return S3DataManager(), DataProcessor(), AnalyticsEngine()
+
+
+@st.cache_resource
+def _get_claude_client(api_key: str):
+    """
+    Build the Claude client once per API key. The underlying Anthropic client
+    keeps its HTTP connection pool, so reruns skip client setup and TLS handshakes.
+    """
+    return ClaudeAnalytics(api_key=api_key)
+
+
 def main():
     """Main application entry point."""
 
@@ -3562,9 +4019,7 @@ def main():
         st.stop()
 
     # Initialize services
-    s3_manager = S3DataManager()
-    processor = DataProcessor()
-    analytics = AnalyticsEngine()
+    s3_manager, processor, analytics = _get_services()
     
     # Initialize session state for data
     if 'sales_data' not in st.session_state:
@@ -3582,6 +4037,9 @@ def main():
     if 'brand_product_mapping' not in st.session_state:
         st.session_state.brand_product_mapping = None
 
+    # Write batched mapping edits left over from earlier reruns
+    _flush_pending_mapping(s3_manager)
+
     # Track data hashes for cache invalidation
     if 'last_s3_hash' not in st.session_state:
         st.session_state.last_s3_hash = None
@@ -3624,8 +4082,10 @@ def main():
         with st.spinner(spinner_msg):
             # Load S3 data if hash changed
             if s3_needs_refresh and current_s3_hash:
-                # Load brand-product mapping (cached by hash)
-                st.session_state.brand_product_mapping = _get_cached_brand_mapping(current_s3_hash, s3_manager)
+                # Load brand-product mapping (cached by hash); unsynced edits are written first
+                if _flush_pending_mapping(s3_manager, force=True):
+                    st.session_state.brand_product_mapping = _get_cached_brand_mapping(current_s3_hash, s3_manager)
+                    _bump_mapping_version()
 
                 # Load all CSV data from S3 (cached by hash)
                 loaded_data = _get_cached_s3_data(current_s3_hash, s3_manager, processor)
@@ -3676,22 +4136,22 @@ def main():
                     st.session_state.dynamo_invoice_count = 0
 
             # Show what was loaded/refreshed
-            loaded_items = []
-            if st.session_state.sales_data is not None:
-                loaded_items.append(f"Sales ({len(st.session_state.sales_data)} records)")
-            if st.session_state.brand_data is not None:
-                loaded_items.append(f"Brands ({len(st.session_state.brand_data)} records)")
-            if st.session_state.product_data is not None:
-                loaded_items.append(f"Products ({len(st.session_state.product_data)} records)")
-            if st.session_state.customer_data is not None:
-                loaded_items.append(f"Customers ({len(st.session_state.customer_data)} records)")
-            if st.session_state.invoice_data is not None:
-                invoice_source = ""
-                if st.session_state.dynamo_invoice_count > 0:
-                    invoice_source = f" ({st.session_state.dynamo_invoice_count} from DynamoDB)"
-                loaded_items.append(f"Invoices ({len(st.session_state.invoice_data)} records{invoice_source})")
-            if st.session_state.budtender_data is not None:
-                loaded_items.append(f"Budtenders ({len(st.session_state.budtender_data)} records)")
+            invoice_source = ""
+            if st.session_state.dynamo_invoice_count > 0:
+                invoice_source = f" ({st.session_state.dynamo_invoice_count} from DynamoDB)"
+            summary_specs = [
+                ('Sales', 'sales_data', 'records'),
+                ('Brands', 'brand_data', 'records'),
+                ('Products', 'product_data', 'records'),
+                ('Customers', 'customer_data', 'records'),
+                ('Invoices', 'invoice_data', f'records{invoice_source}'),
+                ('Budtenders', 'budtender_data', 'records'),
+            ]
+            loaded_items = [
+                f"{label} ({len(data)} {unit})"
+                for label, key, unit in summary_specs
+                if (data := st.session_state.get(key)) is not None
+            ]
             if st.session_state.brand_product_mapping:
                 loaded_items.append(f"Mappings ({len(st.session_state.brand_product_mapping)} brands)")
 
@@ -3833,6 +4293,70 @@ def main():
         render_data_center(s3_manager, processor)
 
 
+def _memo_by_frame(memo_key: str, df: pd.DataFrame, compute, params=None):
+    """
+    Reuse compute(df) across reruns while session state still holds the same
+    DataFrame object. The frame is stored alongside the result, so the identity
+    check cannot match a different frame that happens to reuse the same id().
+    `params` holds any other inputs compute depends on (e.g. filter values);
+    the memo only matches while they compare equal.
+    """
+    memo = st.session_state.get(memo_key)
+    if memo is not None and memo[0] is df and memo[1] == params:
+        return memo[2]
+    result = compute(df)
+    st.session_state[memo_key] = (df, params, result)
+    return result
+
+
+def _filter_upload_period(memo_key: str, df: pd.DataFrame, filter_start, filter_end) -> pd.DataFrame:
+    """Keep rows whose upload period overlaps the filter period, memoized per frame and period."""
+    return _memo_by_frame(
+        memo_key, df,
+        lambda frame: frame[
+            (frame['Upload_Start_Date'] <= filter_end) &
+            (frame['Upload_End_Date'] >= filter_start)
+        ],
+        params=(filter_start, filter_end)
+    )
+
+
+def _brand_category_records(brand_df: pd.DataFrame, mapping: dict) -> list:
+    """Net Sales, mean margin and brand count per mapped product category, as records."""
+    categories = brand_df['Brand'].map(mapping).fillna('Unmapped')
+    category_agg = brand_df.groupby(categories.rename('Product_Category'), observed=True).agg(
+        **{
+            'Net Sales': ('Net Sales', 'sum'),
+            'Gross Margin %': ('Gross Margin %', 'mean'),
+            'Brand_Count': ('Brand', 'count'),
+        }
+    ).reset_index()
+    return category_agg.to_dict('records')
+
+
+def _upload_periods_text(df: pd.DataFrame, noun: str) -> str:
+    """One line per (store, upload period) with its row count, for the Available Data Periods expander."""
+    periods = df.groupby(
+        ['Upload_Start_Date', 'Upload_End_Date', 'Upload_Store'], observed=True
+    ).size().reset_index(name='records')
+    start = periods['Upload_Start_Date'].dt.strftime('%m/%d/%Y').fillna('Unknown')
+    end = periods['Upload_End_Date'].dt.strftime('%m/%d/%Y').fillna('Unknown')
+    lines = (
+        '  • ' + periods['Upload_Store'].astype(str) + ': ' + start + ' - ' + end
+        + ' (' + periods['records'].astype(str) + f' {noun})'
+    )
+    return '\n'.join(lines)
+
+
+def _date_range(df: pd.DataFrame, col: str = 'Date') -> dict:
+    """Earliest and latest dates of a column as YYYY-MM-DD, from one min/max reduction."""
+    if col not in df.columns:
+        return {'start': 'Unknown', 'end': 'Unknown'}
+    start, end = df[col].agg(['min', 'max'])
+    return {'start': start.strftime('%Y-%m-%d'), 'end': end.strftime('%Y-%m-%d')}
+
+
+@st.fragment
 def render_dashboard(state, analytics, store_filter):
     """Render main dashboard overview."""
     st.markdown(f'<h2 style="display: flex; align-items: center; gap: 10px;">{icon("dashboard", "#1e391f", 24)} Overview Dashboard</h2>', unsafe_allow_html=True)
@@ -3845,16 +4369,22 @@ def render_dashboard(state, analytics, store_filter):
             st.info("In production, this would load sample data for demonstration.")
         return
     
-    # Calculate metrics
-    metrics = analytics.calculate_store_metrics(state.sales_data)
+    # Calculate metrics (reused until the sales frame is replaced)
+    metrics = _memo_by_frame('_store_metrics_memo', state.sales_data, analytics.calculate_store_metrics)
     
     # KPI Cards
     col1, col2, col3, col4 = st.columns(4)
     
-    total_sales = sum(m['total_net_sales'] for m in metrics.values())
-    total_transactions = sum(m['total_transactions'] for m in metrics.values())
-    avg_aov = sum(m['avg_order_value'] for m in metrics.values()) / len(metrics)
-    avg_margin = sum(m['avg_margin'] for m in metrics.values()) / len(metrics)
+    # Store totals in one frame; averages are weighted by each store's transactions
+    metrics_df = pd.DataFrame.from_dict(metrics, orient='index')
+    total_sales = metrics_df['total_net_sales'].sum()
+    total_transactions = int(metrics_df['total_transactions'].sum())
+    if total_transactions > 0:
+        avg_aov = total_sales / total_transactions
+        avg_margin = np.average(metrics_df['avg_margin'], weights=metrics_df['total_transactions'])
+    else:
+        avg_aov = metrics_df['avg_order_value'].mean()
+        avg_margin = metrics_df['avg_margin'].mean()
     
     with col1:
         st.metric("Total Net Sales", f"${total_sales:,.0f}")
@@ -3877,7 +4407,7 @@ def render_dashboard(state, analytics, store_filter):
     
     with col2:
         st.subheader("Store Comparison")
-        fig = plot_store_comparison(metrics)
+        fig = plot_store_comparison(metrics_df)
         st.plotly_chart(fig, use_container_width=True)
     
     # Product breakdown
@@ -3990,6 +4520,7 @@ def render_dashboard(state, analytics, store_filter):
             st.info("Research module not installed.")
 
 
+@st.fragment
 def render_sales_analysis(state, analytics, store_filter, date_filter=None):
     """Render comprehensive sales analysis page with all sales-related insights."""
     st.markdown(f'<h2 style="display: flex; align-items: center; gap: 10px;">{icon("chart", "#1e391f", 24)} Sales Analytics</h2>', unsafe_allow_html=True)
@@ -4011,13 +4542,13 @@ def render_sales_analysis(state, analytics, store_filter, date_filter=None):
     
     # ===== TAB 1: Sales Trends =====
     with tab1:
-        df = state.sales_data.copy()
+        df = state.sales_data
 
         # Apply store filter
         if store_filter != "All Stores":
-            store_id = [k for k, v in STORE_DISPLAY_NAMES.items() if v == store_filter]
+            store_id = STORE_ID_BY_DISPLAY.get(store_filter)
             if store_id:
-                df = df[df['Store_ID'] == store_id[0]]
+                df = df[df['Store_ID'] == store_id]
 
         # Filter out invalid data points (zero, null, or suspiciously low values)
         df = df[
@@ -4025,34 +4556,38 @@ def render_sales_analysis(state, analytics, store_filter, date_filter=None):
             (df['Net Sales'] > 100) &
             (df['Customers Count'].notna()) &
             (df['Customers Count'] > 5)
-        ].copy()
-
-        col1, col2 = st.columns(2)
-
-        with col1:
-            # Sales trend
-            fig = px.line(df, x='Date', y='Net Sales', color='Store_ID',
-                         title='Daily Net Sales Trend',
-                         color_discrete_sequence=CHAPTERS_COLOR_SEQUENCE)
-            apply_chapters_theme(fig)
-            fig.update_layout(paper_bgcolor='#ffffff', plot_bgcolor='#ffffff')
-            st.plotly_chart(fig, use_container_width=True)
-
-        with col2:
-            # Customer trend
-            fig = px.line(df, x='Date', y='Customers Count', color='Store_ID',
-                         title='Daily Customer Count',
-                         color_discrete_sequence=CHAPTERS_COLOR_SEQUENCE)
-            apply_chapters_theme(fig)
-            fig.update_layout(paper_bgcolor='#ffffff', plot_bgcolor='#ffffff')
-            st.plotly_chart(fig, use_container_width=True)
+        ]
 
-        # Margin trend
-        fig = px.line(df, x='Date', y='Gross Margin %', color='Store_ID',
-                     title='Gross Margin % Trend',
-                     color_discrete_sequence=CHAPTERS_COLOR_SEQUENCE)
+        # One WebGL figure with shared dates instead of three separately
+        # serialized charts: net sales, customers and margin stacked by row
+        trend_metrics = [
+            ('Net Sales', 'Daily Net Sales Trend'),
+            ('Customers Count', 'Daily Customer Count'),
+            ('Gross Margin %', 'Gross Margin % Trend'),
+        ]
+        fig = make_subplots(
+            rows=len(trend_metrics), cols=1, shared_xaxes=True, vertical_spacing=0.06,
+            subplot_titles=[title for _, title in trend_metrics]
+        )
+        df = df.sort_values('Date')
+        for idx, (store_id, store_df) in enumerate(df.groupby('Store_ID', sort=False, observed=True)):
+            color = CHAPTERS_COLOR_SEQUENCE[idx % len(CHAPTERS_COLOR_SEQUENCE)]
+            for row, (metric, _) in enumerate(trend_metrics, start=1):
+                trace_x, trace_y = _downsample_trace(store_df['Date'], store_df[metric])
+                fig.add_trace(
+                    go.Scattergl(
+                        x=trace_x,
+                        y=trace_y,
+                        name=str(store_id),
+                        legendgroup=str(store_id),
+                        showlegend=row == 1,
+                        mode='lines',
+                        line=dict(color=color)
+                    ),
+                    row=row, col=1
+                )
         apply_chapters_theme(fig)
-        fig.update_layout(paper_bgcolor='#ffffff', plot_bgcolor='#ffffff')
+        fig.update_layout(height=900, paper_bgcolor='#ffffff', plot_bgcolor='#ffffff')
         st.plotly_chart(fig, use_container_width=True)
 
     # ===== TAB 2: Brand Performance =====
@@ -4060,18 +4595,16 @@ def render_sales_analysis(state, analytics, store_filter, date_filter=None):
         if state.brand_data is None:
             st.warning("Please upload brand data to view brand performance.")
         else:
-            df_brand = state.brand_data.copy()
+            df_brand = state.brand_data
 
             # Show available date ranges in the data
             if 'Upload_Start_Date' in df_brand.columns and 'Upload_End_Date' in df_brand.columns:
-                date_ranges = df_brand.groupby(['Upload_Start_Date', 'Upload_End_Date', 'Upload_Store']).size().reset_index(name='records')
+                period_text = _memo_by_frame(
+                    '_brand_periods_text_memo', df_brand, lambda frame: _upload_periods_text(frame, 'brands')
+                )
 
                 with st.expander("Available Data Periods", expanded=False):
-                    for _, row in date_ranges.iterrows():
-                        start = row['Upload_Start_Date'].strftime('%m/%d/%Y') if pd.notna(row['Upload_Start_Date']) else 'Unknown'
-                        end = row['Upload_End_Date'].strftime('%m/%d/%Y') if pd.notna(row['Upload_End_Date']) else 'Unknown'
-                        store = row['Upload_Store']
-                        st.text(f"  • {store}: {start} - {end} ({row['records']} brands)")
+                    st.text(period_text)
 
                 # Filter by date range if provided
                 if date_filter and len(date_filter) == 2:
@@ -4080,10 +4613,7 @@ def render_sales_analysis(state, analytics, store_filter, date_filter=None):
                     filter_end = pd.to_datetime(filter_end)
 
                     # Keep data where upload period overlaps with filter period
-                    df_brand = df_brand[
-                        (df_brand['Upload_Start_Date'] <= filter_end) &
-                        (df_brand['Upload_End_Date'] >= filter_start)
-                    ]
+                    df_brand = _filter_upload_period('_brand_period_memo', df_brand, filter_start, filter_end)
 
                     if len(df_brand) == 0:
                         st.warning(f"No brand data available for the selected date range ({filter_start.strftime('%m/%d/%Y')} - {filter_end.strftime('%m/%d/%Y')})")
@@ -4092,9 +4622,9 @@ def render_sales_analysis(state, analytics, store_filter, date_filter=None):
 
             # Filter by store if specified
             if store_filter and store_filter != 'All Stores':
-                store_id = [k for k, v in STORE_DISPLAY_NAMES.items() if v == store_filter]
+                store_id = STORE_ID_BY_DISPLAY.get(store_filter)
                 if store_id and 'Upload_Store' in df_brand.columns:
-                    df_brand = df_brand[df_brand['Upload_Store'] == store_id[0]]
+                    df_brand = df_brand[df_brand['Upload_Store'] == store_id]
 
             if len(df_brand) > 0:
                 # Top performers
@@ -4120,57 +4650,8 @@ def render_sales_analysis(state, analytics, store_filter, date_filter=None):
                 # Margin vs Sales scatter
                 st.subheader("Margin vs. Sales Analysis")
 
-                # Filter to significant brands with valid margin data
-                significant_brands = df_brand[
-                    (df_brand['Net Sales'] > 1000) &  # Lowered threshold
-                    (df_brand['Gross Margin %'].notna()) &
-                    (df_brand['Gross Margin %'] > 0)
-                ].copy()
-
-                # Handle margin percentage - check if already in percentage form or decimal
-                # If max value > 1, it's already a percentage; if <= 1, it's a decimal
-                if len(significant_brands) > 0:
-                    max_margin = significant_brands['Gross Margin %'].max()
-                    if max_margin <= 1:
-                        # Decimal form (0.55), convert to percentage
-                        significant_brands['Margin_Pct'] = significant_brands['Gross Margin %'] * 100
-                    else:
-                        # Already percentage form (55)
-                        significant_brands['Margin_Pct'] = significant_brands['Gross Margin %']
-
-                    # Color by margin performance - Chapters color scale
-                    chapters_scale = [[0, '#8b1414'], [0.5, '#a3cca4'], [1, '#1e391f']]
-                    fig = px.scatter(
-                        significant_brands,
-                        x='Net Sales',
-                        y='Margin_Pct',
-                        hover_name='Brand',
-                        color='Margin_Pct',
-                        color_continuous_scale=chapters_scale,
-                        size='Net Sales',
-                        size_max=30,
-                        title='Brand Positioning: Sales vs Margin',
-                        log_x=True,
-                        labels={'Margin_Pct': 'Gross Margin %', 'Net Sales': 'Net Sales ($)'}
-                    )
-
-                    # Add quadrant lines
-                    fig.add_hline(
-                        y=55,
-                        line_dash="dash",
-                        line_color="rgba(61, 107, 62, 0.5)",
-                        annotation_text="55% Target Margin",
-                        annotation_position="right"
-                    )
-
-                    apply_chapters_theme(fig)
-                    fig.update_layout(
-                        height=500,
-                        paper_bgcolor='#ffffff',
-                        plot_bgcolor='#ffffff',
-                        coloraxis_colorbar=dict(title="Margin %")
-                    )
-
+                fig = _brand_positioning_fig(df_brand)
+                if fig is not None:
                     st.plotly_chart(fig, use_container_width=True)
                 else:
                     st.info("No brand data with sufficient sales volume to display.")
@@ -4195,18 +4676,16 @@ def render_sales_analysis(state, analytics, store_filter, date_filter=None):
         if state.product_data is None:
             st.warning("Please upload product data to view category analysis.")
         else:
-            df_product = state.product_data.copy()
+            df_product = state.product_data
 
             # Show available date ranges in the data
             if 'Upload_Start_Date' in df_product.columns and 'Upload_End_Date' in df_product.columns:
-                date_ranges = df_product.groupby(['Upload_Start_Date', 'Upload_End_Date', 'Upload_Store']).size().reset_index(name='records')
+                period_text = _memo_by_frame(
+                    '_product_periods_text_memo', df_product, lambda frame: _upload_periods_text(frame, 'categories')
+                )
 
                 with st.expander("Available Data Periods", expanded=False):
-                    for _, row in date_ranges.iterrows():
-                        start = row['Upload_Start_Date'].strftime('%m/%d/%Y') if pd.notna(row['Upload_Start_Date']) else 'Unknown'
-                        end = row['Upload_End_Date'].strftime('%m/%d/%Y') if pd.notna(row['Upload_End_Date']) else 'Unknown'
-                        store = row['Upload_Store']
-                        st.text(f"  • {store}: {start} - {end} ({row['records']} categories)")
+                    st.text(period_text)
 
                 # Filter by date range if provided
                 if date_filter and len(date_filter) == 2:
@@ -4215,10 +4694,7 @@ def render_sales_analysis(state, analytics, store_filter, date_filter=None):
                     filter_end = pd.to_datetime(filter_end)
 
                     # Keep data where upload period overlaps with filter period
-                    df_product = df_product[
-                        (df_product['Upload_Start_Date'] <= filter_end) &
-                        (df_product['Upload_End_Date'] >= filter_start)
-                    ]
+                    df_product = _filter_upload_period('_product_period_memo', df_product, filter_start, filter_end)
 
                     if len(df_product) == 0:
                         st.warning(f"No product data available for the selected date range ({filter_start.strftime('%m/%d/%Y')} - {filter_end.strftime('%m/%d/%Y')})")
@@ -4227,9 +4703,9 @@ def render_sales_analysis(state, analytics, store_filter, date_filter=None):
 
             # Filter by store if specified
             if store_filter and store_filter != 'All Stores':
-                store_id = [k for k, v in STORE_DISPLAY_NAMES.items() if v == store_filter]
+                store_id = STORE_ID_BY_DISPLAY.get(store_filter)
                 if store_id and 'Upload_Store' in df_product.columns:
-                    df_product = df_product[df_product['Upload_Store'] == store_id[0]]
+                    df_product = df_product[df_product['Upload_Store'] == store_id]
 
             if len(df_product) > 0:
                 col1, col2 = st.columns(2)
@@ -4240,7 +4716,7 @@ def render_sales_analysis(state, analytics, store_filter, date_filter=None):
 
                 with col2:
                     st.subheader("Category Details")
-                    df_product['Sales Share %'] = (df_product['Net Sales'] / df_product['Net Sales'].sum() * 100).round(2)
+                    df_product = df_product.assign(**{'Sales Share %': (df_product['Net Sales'] / df_product['Net Sales'].sum() * 100).round(2)})
                     st.dataframe(df_product, width='stretch')
 
                 # Category bar chart - Chapters green scale
@@ -4255,21 +4731,17 @@ def render_sales_analysis(state, analytics, store_filter, date_filter=None):
 
     # ===== TAB 4: Daily Breakdown =====
     with tab4:
-        df = state.sales_data.copy()
+        store_id = STORE_ID_BY_DISPLAY.get(store_filter) if store_filter != "All Stores" else None
 
-        # Apply store filter
-        if store_filter != "All Stores":
-            store_id = [k for k, v in STORE_DISPLAY_NAMES.items() if v == store_filter]
+        def _day_of_week_means(frame):
             if store_id:
-                df = df[df['Store_ID'] == store_id[0]]
+                frame = frame[frame['Store_ID'] == store_id]
+            # Day_of_Week is an ordered category set at clean time, so the
+            # groupby works on codes and emits rows in weekday order
+            return frame.groupby(['Day_of_Week', 'Store_ID'], observed=True)['Net Sales'].mean().reset_index()
 
-        # Day of week analysis
-        df['Day_of_Week'] = df['Date'].dt.day_name()
-        day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-
-        dow_sales = df.groupby(['Day_of_Week', 'Store_ID'])['Net Sales'].mean().reset_index()
-        dow_sales['Day_of_Week'] = pd.Categorical(dow_sales['Day_of_Week'], categories=day_order, ordered=True)
-        dow_sales = dow_sales.sort_values('Day_of_Week')
+        # Day of week analysis, computed once per upload and store
+        dow_sales = _memo_by_frame(f"_dow_sales_{store_id or 'all'}", state.sales_data, _day_of_week_means)
 
         fig = px.bar(dow_sales, x='Day_of_Week', y='Net Sales', color='Store_ID',
                     barmode='group', title='Average Sales by Day of Week',
@@ -4280,18 +4752,25 @@ def render_sales_analysis(state, analytics, store_filter, date_filter=None):
 
     # ===== TAB 5: Raw Data =====
     with tab5:
-        df = state.sales_data.copy()
+        store_id = STORE_ID_BY_DISPLAY.get(store_filter) if store_filter != "All Stores" else None
 
-        # Apply store filter
-        if store_filter != "All Stores":
-            store_id = [k for k, v in STORE_DISPLAY_NAMES.items() if v == store_filter]
+        def _filter_and_sort(frame):
             if store_id:
-                df = df[df['Store_ID'] == store_id[0]]
+                frame = frame[frame['Store_ID'] == store_id]
+            return frame.sort_values('Date', ascending=False)
+
+        # Filtered, newest-first view is computed once per upload and store
+        df = _memo_by_frame(f"_raw_sales_{store_id or 'all'}", state.sales_data, _filter_and_sort)
 
-        st.dataframe(df.sort_values('Date', ascending=False), width='stretch')
+        if len(df) > RAW_DATA_MAX_ROWS:
+            st.caption(f"Showing the {RAW_DATA_MAX_ROWS:,} most recent of {len(df):,} rows. Download for the full data.")
+        st.dataframe(df.head(RAW_DATA_MAX_ROWS), width='stretch', hide_index=True)
 
-        # Download button
-        csv = df.to_csv(index=False)
+        # Download button; serialized once per filtered view, not on every rerun
+        csv = _memo_by_frame(
+            f"_raw_sales_csv_{store_id or 'all'}", df,
+            lambda frame: frame.to_csv(index=False).encode('utf-8')
+        )
         st.download_button("Download Data", csv, "sales_data.csv", "text/csv")
 
     # ===== TAB 6: Customer Analytics =====
@@ -4306,8 +4785,7 @@ def render_sales_analysis(state, analytics, store_filter, date_filter=None):
 @st.cache_data(ttl=300, show_spinner=False)
 def _get_budtender_sales_cached(budtender_data_hash: str, store_filter: str, _df):
     """Cache budtender list and sales calculations to avoid recomputing on every interaction."""
-    # Standardize column names
-    df = _df.copy()
+    # Standardize column names (assign returns a new frame; session data is untouched)
     col_mapping = {
         'Product Brand': 'Product_Brand',
         'Units Sold': 'Units_Sold',
@@ -4316,14 +4794,15 @@ def _get_budtender_sales_cached(budtender_data_hash: str, store_filter: str, _df
         'Discount %': 'Discount_Pct',
         'Store Name': 'Store_Name'
     }
-    for old, new in col_mapping.items():
-        if old in df.columns and new not in df.columns:
-            df[new] = df[old]
+    df = _df.assign(**{
+        new: _df[old] for old, new in col_mapping.items()
+        if old in _df.columns and new not in _df.columns
+    })
 
     # Apply store filter
     if store_filter != "All Stores":
-        store_id = 'barbary_coast' if store_filter == "Barbary Coast" else 'grass_roots'
-        if 'Store_ID' in df.columns:
+        store_id = STORE_ID_BY_DISPLAY.get(store_filter)
+        if store_id and 'Store_ID' in df.columns:
             df = df[df['Store_ID'] == store_id]
 
     # Calculate once and cache
@@ -5071,11 +5550,12 @@ def _render_customer_overview(df):
         st.markdown("**Customer Acquisition Over Time**")
         df_sorted = df.sort_values('Sign-Up Date')
         df_sorted['Cumulative Customers'] = range(1, len(df_sorted) + 1)
+        signup_x, signup_y = _downsample_trace(df_sorted['Sign-Up Date'], df_sorted['Cumulative Customers'])
 
         fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=df_sorted['Sign-Up Date'],
-            y=df_sorted['Cumulative Customers'],
+        fig.add_trace(go.Scattergl(
+            x=signup_x,
+            y=signup_y,
             mode='lines',
             fill='tozeroy',
             line=dict(color='#1e391f', width=2)
@@ -5590,7 +6070,7 @@ def _render_customer_search(df):
             )
 
     # Apply filters
-    filtered_df = df.copy()
+    filtered_df = df
 
     if 'Customer Name' in df.columns and 'search_name' in dir() and search_name:
         filtered_df = filtered_df[
@@ -5637,12 +6117,12 @@ def _render_customer_analytics_content(state, analytics, store_filter, date_filt
         st.info("Upload a CSV file containing customer demographics, transaction history, and loyalty information.")
         return
 
-    df = state.customer_data.copy()
+    df = state.customer_data
 
     # Apply store filter
     if store_filter != "All Stores":
-        store_id = 'barbary_coast' if store_filter == "Barbary Coast" else 'grass_roots'
-        if 'Store_ID' in df.columns:
+        store_id = STORE_ID_BY_DISPLAY.get(store_filter)
+        if store_id and 'Store_ID' in df.columns:
             df = df[df['Store_ID'] == store_id]
 
     st.info(f"Analyzing {len(df)} customers")
@@ -5691,12 +6171,12 @@ def render_customer_analytics(state, analytics, store_filter, date_filter=None):
         st.info("Upload a CSV file containing customer demographics, transaction history, and loyalty information.")
         return
 
-    df = state.customer_data.copy()
+    df = state.customer_data
 
     # Apply store filter
     if store_filter != "All Stores":
-        store_id = 'barbary_coast' if store_filter == "Barbary Coast" else 'grass_roots'
-        if 'Store_ID' in df.columns:
+        store_id = STORE_ID_BY_DISPLAY.get(store_filter)
+        if store_id and 'Store_ID' in df.columns:
             df = df[df['Store_ID'] == store_id]
 
     st.info(f"Analyzing {len(df)} customers")
@@ -5806,11 +6286,12 @@ def render_customer_analytics(state, analytics, store_filter, date_filter=None):
             st.markdown("**Customer Acquisition Over Time**")
             df_sorted = df.sort_values('Sign-Up Date')
             df_sorted['Cumulative Customers'] = range(1, len(df_sorted) + 1)
+            signup_x, signup_y = _downsample_trace(df_sorted['Sign-Up Date'], df_sorted['Cumulative Customers'])
 
             fig = go.Figure()
-            fig.add_trace(go.Scatter(
-                x=df_sorted['Sign-Up Date'],
-                y=df_sorted['Cumulative Customers'],
+            fig.add_trace(go.Scattergl(
+                x=signup_x,
+                y=signup_y,
                 mode='lines',
                 fill='tozeroy',
                 line=dict(color='#1e391f', width=2)
@@ -6330,7 +6811,7 @@ def render_customer_analytics(state, analytics, store_filter, date_filter=None):
                 )
 
         # Apply filters
-        filtered_df = df.copy()
+        filtered_df = df
 
         if 'Customer Name' in df.columns and search_name:
             filtered_df = filtered_df[
@@ -6369,6 +6850,70 @@ def render_customer_analytics(state, analytics, store_filter, date_filter=None):
         )
 
 
+def _brand_positioning_fig(df: pd.DataFrame):
+    """Sales vs margin scatter of significant brands, or None when none qualify."""
+    # Filter to significant brands with valid margin data
+    # Only the plotted columns are selected; loc with a mask already returns a new frame
+    significant_brands = df.loc[
+        (df['Net Sales'] > 1000) &  # Lowered threshold
+        (df['Gross Margin %'].notna()) &
+        (df['Gross Margin %'] > 0),
+        ['Brand', 'Net Sales', 'Gross Margin %']
+    ]
+
+    if len(significant_brands) == 0:
+        return None
+
+    # Handle margin percentage - decimal form (0.55) is scaled, percentage form (55) kept
+    max_margin = significant_brands['Gross Margin %'].max()
+    margin_scale = 100 if max_margin <= 1 else 1
+    significant_brands = significant_brands.assign(
+        Margin_Pct=significant_brands['Gross Margin %'] * margin_scale
+    )
+
+    # Scattergl with area-scaled bubbles (same sizing as px size_max=30), built
+    # directly instead of through px.scatter's per-column marshaling
+    sales = significant_brands['Net Sales'].to_numpy()
+    margins = significant_brands['Margin_Pct'].to_numpy()
+    fig = go.Figure(go.Scattergl(
+        x=sales,
+        y=margins,
+        mode='markers',
+        text=significant_brands['Brand'].to_numpy(),
+        marker=dict(
+            size=sales,
+            sizemode='area',
+            sizeref=2.0 * sales.max() / 30 ** 2,
+            color=margins,
+            colorscale=[[0, '#8b1414'], [0.5, '#a3cca4'], [1, '#1e391f']],
+            showscale=True,
+            colorbar=dict(title="Margin %")
+        ),
+        hovertemplate='<b>%{text}</b><br>Net Sales: $%{x:,.0f}<br>Gross Margin: %{y:.1f}%<extra></extra>'
+    ))
+    fig.update_xaxes(type='log', title_text='Net Sales ($)')
+    fig.update_yaxes(title_text='Gross Margin %')
+    fig.update_layout(title='Brand Positioning: Sales vs Margin')
+
+    # Add quadrant lines
+    fig.add_hline(
+        y=55,
+        line_dash="dash",
+        line_color="rgba(61, 107, 62, 0.5)",
+        annotation_text="55% Target Margin",
+        annotation_position="right"
+    )
+
+    apply_chapters_theme(fig)
+    fig.update_layout(
+        height=500,
+        paper_bgcolor='#ffffff',
+        plot_bgcolor='#ffffff'
+    )
+
+    return fig
+
+
 def render_brand_analysis(state, analytics, store_filter, date_filter=None):
     """Render brand performance analysis page."""
     st.markdown(f'<h2 style="display: flex; align-items: center; gap: 10px;">{icon("tag", "#1e391f", 24)} Brand Performance Analysis</h2>', unsafe_allow_html=True)
@@ -6377,18 +6922,16 @@ def render_brand_analysis(state, analytics, store_filter, date_filter=None):
         st.warning("Please upload brand data first.")
         return
     
-    df = state.brand_data.copy()
+    df = state.brand_data
     
     # Show available date ranges in the data
     if 'Upload_Start_Date' in df.columns and 'Upload_End_Date' in df.columns:
-        date_ranges = df.groupby(['Upload_Start_Date', 'Upload_End_Date', 'Upload_Store']).size().reset_index(name='records')
+        period_text = _memo_by_frame(
+            '_brand_periods_text_memo', df, lambda frame: _upload_periods_text(frame, 'brands')
+        )
         
         with st.expander("Available Data Periods", expanded=False):
-            for _, row in date_ranges.iterrows():
-                start = row['Upload_Start_Date'].strftime('%m/%d/%Y') if pd.notna(row['Upload_Start_Date']) else 'Unknown'
-                end = row['Upload_End_Date'].strftime('%m/%d/%Y') if pd.notna(row['Upload_End_Date']) else 'Unknown'
-                store = row['Upload_Store']
-                st.text(f"  • {store}: {start} - {end} ({row['records']} brands)")
+            st.text(period_text)
         
         # Filter by date range if provided
         if date_filter and len(date_filter) == 2:
@@ -6397,10 +6940,7 @@ def render_brand_analysis(state, analytics, store_filter, date_filter=None):
             filter_end = pd.to_datetime(filter_end)
             
             # Keep data where upload period overlaps with filter period
-            df = df[
-                (df['Upload_Start_Date'] <= filter_end) & 
-                (df['Upload_End_Date'] >= filter_start)
-            ]
+            df = _filter_upload_period('_brand_period_memo', df, filter_start, filter_end)
             
             if len(df) == 0:
                 st.warning(f"No brand data available for the selected date range ({filter_start.strftime('%m/%d/%Y')} - {filter_end.strftime('%m/%d/%Y')})")
@@ -6410,15 +6950,20 @@ def render_brand_analysis(state, analytics, store_filter, date_filter=None):
     
     # Filter by store if specified
     if store_filter and store_filter != 'All Stores':
-        store_id = [k for k, v in STORE_DISPLAY_NAMES.items() if v == store_filter]
+        store_id = STORE_ID_BY_DISPLAY.get(store_filter)
         if store_id and 'Upload_Store' in df.columns:
-            df = df[df['Upload_Store'] == store_id[0]]
+            df = _memo_by_frame(
+                '_brand_store_memo', df,
+                lambda frame: frame[frame['Upload_Store'] == store_id],
+                params=store_id
+            )
     
     # Top performers
     st.subheader("Top Performing Brands")
     top_n = st.slider("Number of brands to show", 10, 50, 20)
     
-    fig = plot_brand_performance(df, top_n)
+    # Figures are memoized on the filtered frame, which keeps its identity across reruns
+    fig = _memo_by_frame('_brand_perf_fig_memo', df, lambda frame: plot_brand_performance(frame, top_n), params=top_n)
     st.plotly_chart(fig, use_container_width=True)
     
     # Brand table
@@ -6437,55 +6982,8 @@ def render_brand_analysis(state, analytics, store_filter, date_filter=None):
     # Margin vs Sales scatter
     st.subheader("Margin vs. Sales Analysis")
 
-    # Filter to significant brands with valid margin data
-    significant_brands = df[
-        (df['Net Sales'] > 1000) &  # Lowered threshold
-        (df['Gross Margin %'].notna()) &
-        (df['Gross Margin %'] > 0)
-    ].copy()
-
-    # Handle margin percentage - check if already in percentage form or decimal
-    if len(significant_brands) > 0:
-        max_margin = significant_brands['Gross Margin %'].max()
-        if max_margin <= 1:
-            # Decimal form (0.55), convert to percentage
-            significant_brands['Margin_Pct'] = significant_brands['Gross Margin %'] * 100
-        else:
-            # Already percentage form (55)
-            significant_brands['Margin_Pct'] = significant_brands['Gross Margin %']
-
-        # Color by margin performance
-        fig = px.scatter(
-            significant_brands,
-            x='Net Sales',
-            y='Margin_Pct',
-            hover_name='Brand',
-            color='Margin_Pct',
-            color_continuous_scale=[[0, '#8b1414'], [0.5, '#a3cca4'], [1, '#1e391f']],
-            size='Net Sales',
-            size_max=30,
-            title='Brand Positioning: Sales vs Margin',
-            log_x=True,
-            labels={'Margin_Pct': 'Gross Margin %', 'Net Sales': 'Net Sales ($)'}
-        )
-
-        # Add quadrant lines
-        fig.add_hline(
-            y=55,
-            line_dash="dash",
-            line_color="rgba(61, 107, 62, 0.5)",
-            annotation_text="55% Target Margin",
-            annotation_position="right"
-        )
-
-        apply_chapters_theme(fig)
-        fig.update_layout(
-            height=500,
-            paper_bgcolor='#ffffff',
-            plot_bgcolor='#ffffff',
-            coloraxis_colorbar=dict(title="Margin %")
-        )
-
+    fig = _memo_by_frame('_brand_positioning_fig_memo', df, _brand_positioning_fig)
+    if fig is not None:
         st.plotly_chart(fig, use_container_width=True)
     else:
         st.info("No brand data with sufficient sales volume to display.")
@@ -6514,18 +7012,16 @@ def render_product_analysis(state, store_filter=None, date_filter=None):
         st.warning("Please upload product data first.")
         return
     
-    df = state.product_data.copy()
+    df = state.product_data
     
     # Show available date ranges in the data
     if 'Upload_Start_Date' in df.columns and 'Upload_End_Date' in df.columns:
-        date_ranges = df.groupby(['Upload_Start_Date', 'Upload_End_Date', 'Upload_Store']).size().reset_index(name='records')
+        period_text = _memo_by_frame(
+            '_product_periods_text_memo', df, lambda frame: _upload_periods_text(frame, 'categories')
+        )
         
         with st.expander("Available Data Periods", expanded=False):
-            for _, row in date_ranges.iterrows():
-                start = row['Upload_Start_Date'].strftime('%m/%d/%Y') if pd.notna(row['Upload_Start_Date']) else 'Unknown'
-                end = row['Upload_End_Date'].strftime('%m/%d/%Y') if pd.notna(row['Upload_End_Date']) else 'Unknown'
-                store = row['Upload_Store']
-                st.text(f"  • {store}: {start} - {end} ({row['records']} categories)")
+            st.text(period_text)
         
         # Filter by date range if provided
         if date_filter and len(date_filter) == 2:
@@ -6534,10 +7030,7 @@ def render_product_analysis(state, store_filter=None, date_filter=None):
             filter_end = pd.to_datetime(filter_end)
             
             # Keep data where upload period overlaps with filter period
-            df = df[
-                (df['Upload_Start_Date'] <= filter_end) & 
-                (df['Upload_End_Date'] >= filter_start)
-            ]
+            df = _filter_upload_period('_product_period_memo', df, filter_start, filter_end)
             
             if len(df) == 0:
                 st.warning(f"No product data available for the selected date range ({filter_start.strftime('%m/%d/%Y')} - {filter_end.strftime('%m/%d/%Y')})")
@@ -6547,9 +7040,9 @@ def render_product_analysis(state, store_filter=None, date_filter=None):
     
     # Filter by store if specified
     if store_filter and store_filter != 'All Stores':
-        store_id = [k for k, v in STORE_DISPLAY_NAMES.items() if v == store_filter]
+        store_id = STORE_ID_BY_DISPLAY.get(store_filter)
         if store_id and 'Upload_Store' in df.columns:
-            df = df[df['Upload_Store'] == store_id[0]]
+            df = df[df['Upload_Store'] == store_id]
     
     col1, col2 = st.columns(2)
     
@@ -6559,7 +7052,7 @@ def render_product_analysis(state, store_filter=None, date_filter=None):
     
     with col2:
         st.subheader("Category Details")
-        df['Sales Share %'] = (df['Net Sales'] / df['Net Sales'].sum() * 100).round(2)
+        df = df.assign(**{'Sales Share %': (df['Net Sales'] / df['Net Sales'].sum() * 100).round(2)})
         st.dataframe(df, width='stretch')
     
     # Category bar chart - Chapters green scale
@@ -6658,14 +7151,12 @@ def _load_document_content(doc_s3_key: str) -> str:
 # =============================================================================
 
 def _get_reports_s3_client():
-    """Get S3 client for report storage."""
+    """Get S3 client for report storage (the shared pooled client, not a new one per call)."""
     try:
-        import boto3
-        return boto3.client(
-            's3',
-            aws_access_key_id=st.secrets['aws']['access_key_id'],
-            aws_secret_access_key=st.secrets['aws']['secret_access_key'],
-            region_name=st.secrets['aws'].get('region', 'us-west-2')
+        return _get_pooled_s3_client(
+            st.secrets['aws']['access_key_id'],
+            st.secrets['aws']['secret_access_key'],
+            st.secrets['aws'].get('region', 'us-west-2')
         )
     except Exception:
         return None
@@ -6847,8 +7338,8 @@ def render_recommendations(state, analytics):
             """)
             return
 
-        # Initialize Claude
-        claude = ClaudeAnalytics(api_key=api_key)
+        # Initialize Claude (one client per API key, shared across reruns)
+        claude = _get_claude_client(api_key)
         
         if not claude.is_available():
             st.error("Could not initialize Claude API. Please check your API key.")
@@ -7113,15 +7604,12 @@ def render_recommendations(state, analytics):
             st.caption("Tip: Set up Brand-Product Mappings for more detailed category insights")
 
         # Calculate store metrics for Claude context
-        metrics = analytics.calculate_store_metrics(state.sales_data)
+        metrics = _memo_by_frame('_store_metrics_memo', state.sales_data, analytics.calculate_store_metrics)
 
         # Prepare data summaries for Claude
         sales_summary = {
             'store_metrics': metrics,
-            'date_range': {
-                'start': state.sales_data['Date'].min().strftime('%Y-%m-%d') if 'Date' in state.sales_data.columns else 'Unknown',
-                'end': state.sales_data['Date'].max().strftime('%Y-%m-%d') if 'Date' in state.sales_data.columns else 'Unknown',
-            },
+            'date_range': _memo_by_frame('_sales_date_range_memo', state.sales_data, _date_range),
             'total_records': len(state.sales_data)
         }
         
@@ -7130,9 +7618,10 @@ def render_recommendations(state, analytics):
         brand_by_category = {}
         if state.brand_data is not None:
             # Filter out promotional brands (containing "$1" or "Promo")
-            filtered_brands = state.brand_data[
-                ~state.brand_data['Brand'].str.contains(r'\$1|Promo', case=False, na=False, regex=True)
-            ]
+            filtered_brands = _memo_by_frame(
+                '_nonpromo_brands_memo', state.brand_data,
+                lambda df: df[~df['Brand'].str.contains(PROMO_BRAND_RE, na=False)]
+            )
 
             top_brands_df = filtered_brands.nlargest(30, 'Net Sales')[['Brand', 'Net Sales', 'Gross Margin %']].copy()
 
@@ -7141,17 +7630,13 @@ def render_recommendations(state, analytics):
             brand_summary = top_brands_df.to_dict('records')
             
             # Aggregate by category for category-level insights
+            # Reused until the brand frame or the mapping contents change
             if brand_product_mapping:
-                all_brands_df = filtered_brands.copy()
-                all_brands_df['Product_Category'] = all_brands_df['Brand'].map(brand_product_mapping).fillna('Unmapped')
-                
-                category_agg = all_brands_df.groupby('Product_Category').agg({
-                    'Net Sales': 'sum',
-                    'Gross Margin %': 'mean',
-                    'Brand': 'count'
-                }).rename(columns={'Brand': 'Brand_Count'}).reset_index()
-                
-                brand_by_category = category_agg.to_dict('records')
+                brand_by_category = _memo_by_frame(
+                    '_brand_category_agg_memo', filtered_brands,
+                    lambda df: _brand_category_records(df, brand_product_mapping),
+                    params=tuple(brand_product_mapping.items())
+                )
         
         # Prepare customer data summary if available
         customer_summary = {}
@@ -7242,14 +7727,18 @@ def render_recommendations(state, analytics):
                     st.warning("Upload brand data first.")
                 else:
                     with st.spinner("Claude is generating deal recommendations..."):
-                        # Find slow movers and high margin items with category info
-                        slow_df = state.brand_data.nsmallest(15, 'Net Sales')[['Brand', 'Net Sales', 'Gross Margin %']].copy()
-                        slow_df['Product_Category'] = slow_df['Brand'].map(brand_product_mapping).fillna('Unmapped')
-                        slow_movers = slow_df.to_dict('records')
-
-                        high_df = state.brand_data[state.brand_data['Gross Margin %'] > 0.6].nlargest(15, 'Net Sales')[['Brand', 'Net Sales', 'Gross Margin %']].copy()
-                        high_df['Product_Category'] = high_df['Brand'].map(brand_product_mapping).fillna('Unmapped')
-                        high_margin = high_df.to_dict('records')
+                        # Find slow movers and high margin items with category info. Both
+                        # are slices of the cached brand summary, already sorted by sales.
+                        ranked = analytics.brand_summary(state.brand_data)[['Brand', 'Net Sales', 'Gross Margin %']]
+                        slow_df = ranked.tail(15).iloc[::-1]
+                        high_df = ranked[ranked['Gross Margin %'] > 0.6].head(15)
+
+                        slow_movers = slow_df.assign(
+                            Product_Category=slow_df['Brand'].map(brand_product_mapping).fillna('Unmapped')
+                        ).to_dict('records')
+                        high_margin = high_df.assign(
+                            Product_Category=high_df['Brand'].map(brand_product_mapping).fillna('Unmapped')
+                        ).to_dict('records')
 
                         analysis = claude.generate_deal_recommendations(slow_movers, high_margin)
                         st.session_state.ai_analysis_title = "Deal Recommendations"
@@ -7702,9 +8191,12 @@ Focus on actionable improvements that will drive more organic traffic and local
             context = {
                 'sales_summary': sales_summary,
                 'top_brands': brand_summary[:20] if brand_summary else [],
-                'product_mix': state.product_data.to_dict('records') if state.product_data is not None else [],
+                'product_mix': (
+                    _memo_by_frame('_product_records_memo', state.product_data, lambda df: df.to_dict('records'))
+                    if state.product_data is not None else []
+                ),
                 'brand_by_category': brand_by_category if brand_by_category else [],
-                'brand_product_mapping_sample': dict(list(brand_product_mapping.items())[:30]) if brand_product_mapping else {},
+                'brand_product_mapping_sample': dict(islice(brand_product_mapping.items(), 30)),
                 'customer_summary': customer_summary if customer_summary else {}
             }
 
@@ -7983,6 +8475,79 @@ Focus on actionable improvements that will drive more organic traffic and local
                             st.caption("To print: Expand report → Right-click → Print")
 
 
+def _bump_mapping_version():
+    """Mark brand_product_mapping as changed so memos keyed on mapping_version recompute."""
+    st.session_state.mapping_version = st.session_state.get('mapping_version', 0) + 1
+
+
+def _save_brand_mapping(s3_manager, mapping: dict, defer: bool = False) -> tuple:
+    """
+    Write the brand-product mapping to S3. With defer=True (batch mode) the
+    edit is only counted and the write waits for MAPPING_FLUSH_EDITS pending
+    edits or MAPPING_FLUSH_SECONDS since the last write; _flush_pending_mapping
+    writes any leftovers on a later rerun. Returns (success, message), with
+    success None when the write was deferred.
+    """
+    _bump_mapping_version()
+    pending = st.session_state.get('pending_mapping_writes', 0) + 1
+    since_flush = time.time() - st.session_state.get('mapping_last_flush', 0.0)
+    if defer and pending < MAPPING_FLUSH_EDITS and since_flush < MAPPING_FLUSH_SECONDS:
+        st.session_state.pending_mapping_writes = pending
+        return None, f"{pending} edit(s) pending sync"
+
+    success, message = s3_manager.save_brand_product_mapping(mapping)
+    if success:
+        st.session_state.pending_mapping_writes = 0
+        st.session_state.mapping_last_flush = time.time()
+    else:
+        # Keep counting so the edit is retried by the next flush
+        st.session_state.pending_mapping_writes = pending
+    return success, message
+
+
+def _flush_pending_mapping(s3_manager, force: bool = False) -> bool:
+    """
+    Write batched quick-mapping edits that are still only in session state.
+    Runs at the start of every rerun once MAPPING_FLUSH_SECONDS have passed,
+    and with force=True before anything replaces brand_product_mapping.
+    Returns False while edits remain unsynced.
+    """
+    if not st.session_state.get('pending_mapping_writes'):
+        return True
+    since_flush = time.time() - st.session_state.get('mapping_last_flush', 0.0)
+    if force or since_flush >= MAPPING_FLUSH_SECONDS:
+        success, message = s3_manager.save_brand_product_mapping(st.session_state.brand_product_mapping or {})
+        if success:
+            st.session_state.pending_mapping_writes = 0
+            st.session_state.mapping_last_flush = time.time()
+            return True
+        st.error(f"Could not sync pending brand mappings: {message}")
+    return False
+
+
+def _filter_mapping_brands(brands: list, lowered: dict, mapping: dict, filter_category: str,
+                           search_term: str, sort_option: str) -> list:
+    """
+    Brands for the Bulk Edit tab, filtered by category and search text and sorted.
+    `lowered` maps each brand to its lowercase form, built once per brand list.
+    """
+    mapped = mapping.keys()
+    if filter_category == "Unmapped":
+        brands = [b for b in brands if b not in mapped]
+    elif filter_category != "All Categories":
+        brands = [b for b in brands if mapping.get(b) == filter_category]
+
+    if search_term:
+        needle = search_term.lower()
+        brands = [b for b in brands if needle in lowered[b]]
+
+    if sort_option == "Mapped First":
+        return sorted(brands, key=lambda b: (b not in mapped, lowered[b]))
+    if sort_option == "Unmapped First":
+        return sorted(brands, key=lambda b: (b in mapped, lowered[b]))
+    return sorted(brands, key=lowered.__getitem__)
+
+
 def render_brand_product_mapping(state, s3_manager):
     """Render brand-product mapping configuration interface."""
     st.markdown("""
@@ -7996,8 +8561,10 @@ def render_brand_product_mapping(state, s3_manager):
         return
     
     # Get unique brands from the data
-    brands = state.brand_data['Brand'].unique().tolist()
-    brands = sorted([b for b in brands if pd.notna(b) and str(b).strip()])
+    brands = _memo_by_frame(
+        '_mapping_brands_memo', state.brand_data,
+        lambda df: sorted(b for b in df['Brand'].unique().tolist() if pd.notna(b) and str(b).strip())
+    )
     
     # Define product categories (from your data)
     product_categories = [
@@ -8018,7 +8585,8 @@ def render_brand_product_mapping(state, s3_manager):
     current_mapping = state.brand_product_mapping or {}
     
     # Stats
-    mapped_count = len([b for b in brands if b in current_mapping])
+    mapped = current_mapping.keys()
+    mapped_count = len(mapped & set(brands))
     st.info(f"**{mapped_count}** of **{len(brands)}** brands mapped ({100*mapped_count/len(brands):.1f}%)")
     
     # Tabs for different views
@@ -8027,6 +8595,15 @@ def render_brand_product_mapping(state, s3_manager):
     with tab1:
         st.subheader("Quick Mapping")
         st.markdown("Select a brand and assign it to a product category.")
+
+        # Each save is written to S3 unless the user opts into batching
+        batch_mode = st.toggle(
+            "Batch quick edits",
+            key="quick_batch_mode",
+            help=f"Write to S3 every {MAPPING_FLUSH_EDITS} edits or {MAPPING_FLUSH_SECONDS}s instead of on every save"
+        )
+        if not batch_mode:
+            _flush_pending_mapping(s3_manager, force=True)
         
         col1, col2, col3 = st.columns([2, 2, 1])
         
@@ -8035,7 +8612,7 @@ def render_brand_product_mapping(state, s3_manager):
             show_unmapped_only = st.checkbox("Show unmapped brands only", value=True)
             
             if show_unmapped_only:
-                available_brands = [b for b in brands if b not in current_mapping]
+                available_brands = [b for b in brands if b not in mapped]
             else:
                 available_brands = brands
             
@@ -8069,13 +8646,27 @@ def render_brand_product_mapping(state, s3_manager):
                     current_mapping[selected_brand] = selected_category
                     state.brand_product_mapping = current_mapping
                     
-                    # Save to S3
-                    success, message = s3_manager.save_brand_product_mapping(current_mapping)
-                    if success:
+                    # Save to S3 (batched into one write in batch mode)
+                    success, message = _save_brand_mapping(s3_manager, current_mapping, defer=batch_mode)
+                    if success is None:
+                        st.info(f"Mapped '{selected_brand}' → {selected_category} ({message})")
+                    elif success:
                         st.success(f"Mapped '{selected_brand}' → {selected_category}")
                     else:
                         st.warning(f"Saved locally. S3: {message}")
                     st.rerun()
+
+        pending_writes = st.session_state.get('pending_mapping_writes', 0)
+        if pending_writes:
+            st.warning(
+                f"{pending_writes} mapping edit(s) are not yet saved to S3. "
+                "Sync before closing this tab or they will be lost."
+            )
+            if st.button(f"Sync {pending_writes} pending edit(s) to S3", key="quick_sync"):
+                success, message = _save_brand_mapping(s3_manager, current_mapping)
+                if not success:
+                    st.warning(f"Saved locally. S3: {message}")
+                st.rerun()
     
     with tab2:
         st.subheader("Bulk Edit")
@@ -8098,24 +8689,13 @@ def render_brand_product_mapping(state, s3_manager):
                 key="bulk_sort"
             )
 
-        # Filter brands
-        filtered_brands = brands.copy()
-
-        if filter_category == "Unmapped":
-            filtered_brands = [b for b in filtered_brands if b not in current_mapping]
-        elif filter_category != "All Categories":
-            filtered_brands = [b for b in filtered_brands if current_mapping.get(b) == filter_category]
-
-        if search_term:
-            filtered_brands = [b for b in filtered_brands if search_term.lower() in b.lower()]
-
-        # Sort brands based on selected option
-        if sort_option == "Mapped First":
-            filtered_brands = sorted(filtered_brands, key=lambda b: (b not in current_mapping, b.lower()))
-        elif sort_option == "Unmapped First":
-            filtered_brands = sorted(filtered_brands, key=lambda b: (b in current_mapping, b.lower()))
-        else:  # Alphabetical
-            filtered_brands = sorted(filtered_brands, key=lambda b: b.lower())
+        # Filter and sort once per data/filter/mapping state, not on every rerun
+        lowered = _memo_by_frame('_mapping_brands_lower_memo', state.brand_data, lambda _: {b: b.lower() for b in brands})
+        filtered_brands = _memo_by_frame(
+            '_bulk_brands_memo', state.brand_data,
+            lambda _: _filter_mapping_brands(brands, lowered, current_mapping, filter_category, search_term, sort_option),
+            params=(filter_category, search_term, sort_option, st.session_state.get('mapping_version', 0))
+        )
         
         st.caption(f"Showing {len(filtered_brands)} brands")
         
@@ -8138,26 +8718,36 @@ def render_brand_product_mapping(state, s3_manager):
             if 'bulk_changes' not in st.session_state:
                 st.session_state.bulk_changes = {}
             
-            for brand in batch_brands:
-                col1, col2 = st.columns([3, 2])
-                with col1:
-                    st.text(brand)
-                with col2:
-                    current_cat = current_mapping.get(brand, "")
-                    default_idx = product_categories.index(current_cat) if current_cat in product_categories else len(product_categories)
-                    
-                    new_cat = st.selectbox(
+            # One data editor per page instead of a selectbox widget per brand;
+            # the key follows the page's brands so row edits stay with their brands
+            not_mapped = "-- Not Mapped --"
+            batch_df = pd.DataFrame({
+                "Brand": batch_brands,
+                "Category": [
+                    current_mapping.get(b) if current_mapping.get(b) in product_categories else not_mapped
+                    for b in batch_brands
+                ]
+            })
+            edited = st.data_editor(
+                batch_df,
+                column_config={
+                    "Category": st.column_config.SelectboxColumn(
                         "Category",
-                        options=product_categories + ["-- Not Mapped --"],
-                        index=default_idx if current_cat else len(product_categories),
-                        key=f"bulk_{brand}",
-                        label_visibility="collapsed"
+                        options=product_categories + [not_mapped],
+                        required=True
                     )
-                    
-                    if new_cat != "-- Not Mapped --":
-                        st.session_state.bulk_changes[brand] = new_cat
-                    elif brand in st.session_state.bulk_changes:
-                        del st.session_state.bulk_changes[brand]
+                },
+                disabled=["Brand"],
+                hide_index=True,
+                width='stretch',
+                key=f"bulk_editor_{hash(tuple(batch_brands))}"
+            )
+
+            for brand, new_cat in zip(edited["Brand"], edited["Category"]):
+                if new_cat != not_mapped:
+                    st.session_state.bulk_changes[brand] = new_cat
+                elif brand in st.session_state.bulk_changes:
+                    del st.session_state.bulk_changes[brand]
             
             st.markdown("---")
             
@@ -8169,7 +8759,7 @@ def render_brand_product_mapping(state, s3_manager):
                 state.brand_product_mapping = current_mapping
                 
                 # Save to S3
-                success, message = s3_manager.save_brand_product_mapping(current_mapping)
+                success, message = _save_brand_mapping(s3_manager, current_mapping)
                 if success:
                     st.success(f"Saved {len(st.session_state.bulk_changes)} mappings")
                 else:
@@ -8235,7 +8825,7 @@ def render_brand_product_mapping(state, s3_manager):
                         if isinstance(imported, dict):
                             if st.button("Apply Imported Mappings"):
                                 state.brand_product_mapping = imported
-                                success, message = s3_manager.save_brand_product_mapping(imported)
+                                success, message = _save_brand_mapping(s3_manager, imported)
                                 if success:
                                     st.success(f"Imported {len(imported)} mappings")
                                 else:
@@ -8250,11 +8840,126 @@ def render_brand_product_mapping(state, s3_manager):
             st.markdown("---")
             if st.button("Clear All Mappings", type="secondary"):
                 state.brand_product_mapping = {}
-                s3_manager.save_brand_product_mapping({})
+                _save_brand_mapping(s3_manager, {})
                 st.success("All mappings cleared")
                 st.rerun()
 
 
+def _render_direct_s3_upload(presigned_url: str, s3_key: str):
+    """Render a browser-side file picker that PUTs the file straight to a presigned S3 URL."""
+    import streamlit.components.v1 as components
+    components.html(f"""
+        <input type="file" id="direct-file" accept=".csv">
+        <button id="direct-send">Upload to S3</button>
+        <div id="direct-status" style="font-family: sans-serif; font-size: 13px; margin-top: 6px;"></div>
+        <script>
+            const status = document.getElementById('direct-status');
+            document.getElementById('direct-send').onclick = async () => {{
+                const file = document.getElementById('direct-file').files[0];
+                if (!file) {{ status.textContent = 'Choose a CSV file first.'; return; }}
+                status.textContent = 'Uploading ' + file.name + '...';
+                try {{
+                    const resp = await fetch({json.dumps(presigned_url)}, {{
+                        method: 'PUT', headers: {{'Content-Type': 'text/csv'}}, body: file
+                    }});
+                    status.textContent = resp.ok
+                        ? 'Uploaded to ' + {json.dumps(s3_key)} + '. Use "Reload from S3" to load it.'
+                        : 'Upload failed (HTTP ' + resp.status + ').';
+                }} catch (e) {{
+                    status.textContent = 'Upload failed: ' + e;
+                }}
+            }};
+        </script>
+    """, height=90)
+
+
+def _merge_upload(existing: pd.DataFrame, processed: pd.DataFrame, key_cols: list) -> pd.DataFrame:
+    """
+    Append a processed upload to an existing session frame, replacing existing
+    rows that share a key with the upload (the upload's own duplicates keep the
+    last row). Unlike concat + drop_duplicates, rows already duplicated within
+    `existing` are left as they are, and the result has a fresh RangeIndex.
+    """
+    if existing is None:
+        return processed
+    if not set(key_cols).issubset(existing.columns):
+        return pd.concat([existing, processed]).drop_duplicates(subset=key_cols, keep='last')
+    processed = processed.drop_duplicates(subset=key_cols, keep='last')
+    replaced = pd.MultiIndex.from_frame(existing[key_cols]).isin(
+        pd.MultiIndex.from_frame(processed[key_cols])
+    )
+    return pd.concat([existing[~replaced], processed], ignore_index=True)
+
+
+@st.cache_data(show_spinner=False)
+def _read_uploaded_csv(file_bytes: bytes) -> pd.DataFrame:
+    """
+    Parse an uploaded CSV once per distinct file content. Uses pandas' Arrow
+    engine (multi-threaded C++ parser) and falls back to the default parser for
+    files Arrow rejects, e.g. ragged rows.
+    """
+    try:
+        return pd.read_csv(io.BytesIO(file_bytes), engine='pyarrow')
+    except (pa.ArrowInvalid, ValueError):
+        return pd.read_csv(io.BytesIO(file_bytes), low_memory=False)
+
+
+@st.cache_data(show_spinner=False)
+def _clean_uploaded_csv(file_bytes: bytes, clean_method: str) -> pd.DataFrame:
+    """Parse and clean an uploaded CSV once per distinct file content and cleaner."""
+    return getattr(DataProcessor, clean_method)(_read_uploaded_csv(file_bytes))
+
+
+@st.cache_data(show_spinner=False)
+def _brand_sample_count(file_bytes: bytes) -> int:
+    """
+    Number of [DS]/[SS] sample rows in an uploaded brand report, counted once
+    per file on the same stripped names clean_brand_data filters on.
+    """
+    df = _read_uploaded_csv(file_bytes)
+    brands = df['Brand'] if 'Brand' in df.columns else df['Product Brand']
+    return int(DataProcessor._sample_mask(brands.str.strip()).sum())
+
+
+def _process_upload(kind: str, uploaded_file, clean_method: str, key_cols: list,
+                    s3_manager, store_id: str, start_date, end_date,
+                    tag_store_id: bool = True) -> pd.DataFrame:
+    """
+    Clean an uploaded report, tag it with upload metadata, merge it into
+    st.session_state.<kind>_data and archive the raw file under raw-uploads/.
+    Returns the processed frame.
+    """
+    processed = _clean_uploaded_csv(uploaded_file.getvalue(), clean_method)
+
+    # Add metadata
+    processed['Upload_Store'] = pd.Series(store_id, index=processed.index, dtype=UPLOAD_STORE_DTYPE)
+    processed['Upload_Start_Date'] = pd.to_datetime(start_date)
+    processed['Upload_End_Date'] = pd.to_datetime(end_date)
+
+    # If store is manually specified and not "combined", override Store_ID
+    if tag_store_id and store_id != "combined":
+        processed['Store_ID'] = pd.Series(store_id, index=processed.index, dtype=STORE_ID_DTYPE)
+
+    # Merge with existing data or replace
+    state_key = f"{kind}_data"
+    st.session_state[state_key] = _merge_upload(st.session_state[state_key], processed, key_cols)
+
+    # Upload to S3 with metadata in path
+    uploaded_file.seek(0)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    date_range_str = f"{start_date.strftime('%Y%m%d')}-{end_date.strftime('%Y%m%d')}"
+    s3_key = f"raw-uploads/{store_id}/{kind}_{date_range_str}_{timestamp}.csv"
+
+    success, message = s3_manager.upload_file(uploaded_file, s3_key)
+    if success:
+        st.success(f"{message}")
+    else:
+        st.warning(f"S3 upload failed: {message}")
+        st.info("Data processed locally but NOT saved to S3")
+
+    return processed
+
+
 def render_data_center(s3_manager, processor):
     """Render Data Center page with tabbed interface for all data management features."""
     st.markdown(f'<h2 style="display: flex; align-items: center; gap: 10px;">{icon("database", "#1e391f", 24)} Data Center</h2>', unsafe_allow_html=True)
@@ -8335,17 +9040,12 @@ def render_data_center(s3_manager, processor):
     with settings_col1:
         selected_store = st.selectbox(
             "Select Store",
-            options=["Barbary Coast", "Grass Roots", "Both Stores (Combined)"],
+            options=list(UPLOAD_STORE_IDS),
             help="Which store does this data belong to?"
         )
         
         # Map display name to internal ID
-        store_id_map = {
-            "Barbary Coast": "barbary_coast",
-            "Grass Roots": "grass_roots",
-            "Both Stores (Combined)": "combined"
-        }
-        store_id = store_id_map[selected_store]
+        store_id = UPLOAD_STORE_IDS[selected_store]
     
     with settings_col2:
         # Default date range (last 30 days)
@@ -8443,7 +9143,7 @@ def render_data_center(s3_manager, processor):
             sales_file = st.file_uploader("Upload Sales by Store CSV", type=['csv'], key='sales_upload')
 
             if sales_file:
-                df = pd.read_csv(sales_file)
+                df = _read_uploaded_csv(sales_file.getvalue())
                 st.success(f"Loaded {len(df)} rows")
 
                 # Preview
@@ -8451,39 +9151,10 @@ def render_data_center(s3_manager, processor):
                     st.dataframe(df.head(), width='stretch')
 
                 if st.button("Process Sales Data", key="process_sales"):
-                    processed = processor.clean_sales_by_store(df)
-
-                    # Add metadata
-                    processed['Upload_Store'] = store_id
-                    processed['Upload_Start_Date'] = pd.to_datetime(start_date)
-                    processed['Upload_End_Date'] = pd.to_datetime(end_date)
-
-                    # If store is manually specified and not "combined", override Store_ID
-                    if store_id != "combined":
-                        processed['Store_ID'] = store_id
-
-                    # Merge with existing data or replace
-                    if st.session_state.sales_data is not None:
-                        # Option to append or replace
-                        st.session_state.sales_data = pd.concat([
-                            st.session_state.sales_data,
-                            processed
-                        ]).drop_duplicates(subset=['Store', 'Date'], keep='last')
-                    else:
-                        st.session_state.sales_data = processed
-
-                    # Upload to S3 with metadata in path
-                    sales_file.seek(0)
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    date_range_str = f"{start_date.strftime('%Y%m%d')}-{end_date.strftime('%Y%m%d')}"
-                    s3_key = f"raw-uploads/{store_id}/sales_{date_range_str}_{timestamp}.csv"
-
-                    success, message = s3_manager.upload_file(sales_file, s3_key)
-                    if success:
-                        st.success(f"{message}")
-                    else:
-                        st.warning(f"S3 upload failed: {message}")
-                        st.info("Data processed locally but NOT saved to S3")
+                    _process_upload(
+                        'sales', sales_file, 'clean_sales_by_store', ['Store', 'Date'],
+                        s3_manager, store_id, start_date, end_date
+                    )
 
                     st.success("Data processed and ready!")
                     st.rerun()
@@ -8493,7 +9164,7 @@ def render_data_center(s3_manager, processor):
             brand_file = st.file_uploader("Upload Net Sales by Brand CSV", type=['csv'], key='brand_upload')
 
             if brand_file:
-                df = pd.read_csv(brand_file)
+                df = _read_uploaded_csv(brand_file.getvalue())
                 st.success(f"Loaded {len(df)} rows")
 
                 # Handle column name change: Treez renamed 'Brand' to 'Product Brand' after 12/01/2025
@@ -8507,7 +9178,7 @@ def render_data_center(s3_manager, processor):
                     st.info("Please upload a 'Net Sales by Brand' report from Treez.")
                 else:
                     # Show sample record count that will be filtered
-                    sample_count = df['Brand'].str.startswith(('[DS]', '[SS]'), na=False).sum()
+                    sample_count = _brand_sample_count(brand_file.getvalue())
                     if sample_count > 0:
                         st.info(f"{sample_count} sample records ([DS]/[SS]) will be filtered out")
 
@@ -8516,43 +9187,15 @@ def render_data_center(s3_manager, processor):
                         st.dataframe(df.head(), width='stretch')
 
                 if 'Brand' in df.columns and st.button("Process Brand Data", key="process_brand"):
-                    original_count = len(df)
-                    processed = processor.clean_brand_data(df)
-                    filtered_count = original_count - len(processed)
+                    processed = _process_upload(
+                        'brand', brand_file, 'clean_brand_data', ['Brand', 'Upload_Store', 'Upload_Start_Date'],
+                        s3_manager, store_id, start_date, end_date
+                    )
 
+                    filtered_count = len(df) - len(processed)
                     if filtered_count > 0:
                         st.info(f"Filtered out {filtered_count} records (samples + zero/negative sales)")
 
-                    # Add metadata
-                    processed['Upload_Store'] = store_id
-                    processed['Upload_Start_Date'] = pd.to_datetime(start_date)
-                    processed['Upload_End_Date'] = pd.to_datetime(end_date)
-
-                    # If store is manually specified and not "combined", set Store_ID
-                    if store_id != "combined":
-                        processed['Store_ID'] = store_id
-
-                    # Merge with existing data or replace
-                    if st.session_state.brand_data is not None:
-                        st.session_state.brand_data = pd.concat([
-                            st.session_state.brand_data,
-                            processed
-                        ]).drop_duplicates(subset=['Brand', 'Upload_Store', 'Upload_Start_Date'], keep='last')
-                    else:
-                        st.session_state.brand_data = processed
-
-                    brand_file.seek(0)
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    date_range_str = f"{start_date.strftime('%Y%m%d')}-{end_date.strftime('%Y%m%d')}"
-                    s3_key = f"raw-uploads/{store_id}/brand_{date_range_str}_{timestamp}.csv"
-
-                    success, message = s3_manager.upload_file(brand_file, s3_key)
-                    if success:
-                        st.success(f"{message}")
-                    else:
-                        st.warning(f"S3 upload failed: {message}")
-                        st.info("Data processed locally but NOT saved to S3")
-
                     st.success("Data processed!")
                     st.rerun()
 
@@ -8561,7 +9204,7 @@ def render_data_center(s3_manager, processor):
             product_file = st.file_uploader("Upload Net Sales by Product CSV", type=['csv'], key='product_upload')
 
             if product_file:
-                df = pd.read_csv(product_file)
+                df = _read_uploaded_csv(product_file.getvalue())
                 st.success(f"Loaded {len(df)} rows")
 
                 # Preview
@@ -8569,37 +9212,51 @@ def render_data_center(s3_manager, processor):
                     st.dataframe(df.head(), width='stretch')
 
                 if st.button("Process Product Data", key="process_product"):
-                    processed = processor.clean_product_data(df)
-
-                    # Add metadata
-                    processed['Upload_Store'] = store_id
-                    processed['Upload_Start_Date'] = pd.to_datetime(start_date)
-                    processed['Upload_End_Date'] = pd.to_datetime(end_date)
-
-                    # Merge with existing data or replace
-                    if st.session_state.product_data is not None:
-                        st.session_state.product_data = pd.concat([
-                            st.session_state.product_data,
-                            processed
-                        ]).drop_duplicates(subset=['Product Type', 'Upload_Store', 'Upload_Start_Date'], keep='last')
-                    else:
-                        st.session_state.product_data = processed
-
-                    product_file.seek(0)
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    date_range_str = f"{start_date.strftime('%Y%m%d')}-{end_date.strftime('%Y%m%d')}"
-                    s3_key = f"raw-uploads/{store_id}/product_{date_range_str}_{timestamp}.csv"
-
-                    success, message = s3_manager.upload_file(product_file, s3_key)
-                    if success:
-                        st.success(f"{message}")
-                    else:
-                        st.warning(f"S3 upload failed: {message}")
-                        st.info("Data processed locally but NOT saved to S3")
+                    _process_upload(
+                        'product', product_file, 'clean_product_data', ['Product Type', 'Upload_Store', 'Upload_Start_Date'],
+                        s3_manager, store_id, start_date, end_date, tag_store_id=False
+                    )
 
                     st.success("Data processed!")
                     st.rerun()
 
+        # Large exports can skip the server entirely: the browser PUTs the raw CSV
+        # to raw-uploads/, where "Reload from S3" picks it up like any other upload
+        with st.expander("Large file? Upload directly to S3"):
+            direct_kind = st.selectbox("Report type", ["sales", "brand", "product"], key="direct_upload_kind")
+            date_range_str = f"{start_date.strftime('%Y%m%d')}-{end_date.strftime('%Y%m%d')}"
+            link_params = (direct_kind, store_id, date_range_str)
+
+            # The key and URL are made on request and kept until they expire, so
+            # reruns do not remount the upload widget and drop a chosen file
+            link = st.session_state.get('direct_upload_link')
+            if link and (link['params'] != link_params or time.time() >= link['expires_at']):
+                link = None
+                st.session_state.pop('direct_upload_link', None)
+
+            if link is None and st.button("Get upload link", key="direct_upload_link_btn"):
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                direct_key = f"raw-uploads/{store_id}/{direct_kind}_{date_range_str}_{timestamp}.csv"
+                presigned_url = s3_manager.generate_presigned_put(direct_key, expires=DIRECT_UPLOAD_URL_SECONDS)
+                if presigned_url:
+                    link = {
+                        'params': link_params,
+                        'key': direct_key,
+                        'url': presigned_url,
+                        'expires_at': time.time() + DIRECT_UPLOAD_URL_SECONDS,
+                    }
+                    st.session_state.direct_upload_link = link
+                else:
+                    st.info("Direct upload needs a configured S3 connection.")
+
+            if link:
+                _render_direct_s3_upload(link['url'], link['key'])
+                st.caption(
+                    "Files uploaded this way skip the column checks done above (e.g. the Brand column); "
+                    "they are only validated when loaded with \"Reload from S3\"."
+                )
+                st.caption("Requires the bucket's CORS policy to allow PUT from this app's origin.")
+
     # =========================================================================
     # INVOICE DATA TAB
     # =========================================================================
@@ -8655,7 +9312,7 @@ def render_data_center(s3_manager, processor):
         )
 
         if customer_file:
-            df = pd.read_csv(customer_file)
+            df = _read_uploaded_csv(customer_file.getvalue())
             st.success(f"Loaded {len(df)} customer records")
 
             # Preview
@@ -8666,22 +9323,16 @@ def render_data_center(s3_manager, processor):
             if st.button("Process Customer Data", key="process_customer"):
                 with st.spinner("Processing customer data..."):
                     # Clean and process customer data
-                    processed = processor.clean_customer_data(df)
+                    processed = _clean_uploaded_csv(customer_file.getvalue(), 'clean_customer_data')
 
                     # Add metadata
-                    processed['Upload_Store'] = store_id
+                    processed['Upload_Store'] = pd.Series(store_id, index=processed.index, dtype=UPLOAD_STORE_DTYPE)
                     processed['Upload_Date'] = pd.to_datetime(datetime.now())
 
                     # Merge with existing data or replace
-                    if st.session_state.customer_data is not None:
-                        # Merge by Customer ID, keeping latest version
-                        customer_id_col = 'Customer ID' if 'Customer ID' in processed.columns else 'id'
-                        st.session_state.customer_data = pd.concat([
-                            st.session_state.customer_data,
-                            processed
-                        ]).drop_duplicates(subset=[customer_id_col], keep='last')
-                    else:
-                        st.session_state.customer_data = processed
+                    # Merge by Customer ID, keeping latest version
+                    customer_id_col = 'Customer ID' if 'Customer ID' in processed.columns else 'id'
+                    st.session_state.customer_data = _merge_upload(st.session_state.customer_data, processed, [customer_id_col])
 
                     # Upload to S3
                     customer_file.seek(0)
@@ -8813,7 +9464,7 @@ def render_data_center(s3_manager, processor):
 
             if bc_budtender_file:
                 try:
-                    bc_df = pd.read_csv(bc_budtender_file)
+                    bc_df = _read_uploaded_csv(bc_budtender_file.getvalue())
                     bc_df['Store_ID'] = 'barbary_coast'
                     st.success(f"Loaded {len(bc_df):,} records from Barbary Coast")
 
@@ -8852,7 +9503,7 @@ def render_data_center(s3_manager, processor):
 
             if gr_budtender_file:
                 try:
-                    gr_df = pd.read_csv(gr_budtender_file)
+                    gr_df = _read_uploaded_csv(gr_budtender_file.getvalue())
                     gr_df['Store_ID'] = 'grass_roots'
                     st.success(f"Loaded {len(gr_df):,} records from Grass Roots")
 
@@ -9201,8 +9852,10 @@ def render_data_center(s3_manager, processor):
                 if loaded_data.get('budtender') is not None:
                     st.session_state.budtender_data = loaded_data['budtender']
 
-                # Also reload mappings
-                st.session_state.brand_product_mapping = s3_manager.load_brand_product_mapping()
+                # Also reload mappings, writing unsynced edits first
+                if _flush_pending_mapping(s3_manager, force=True):
+                    st.session_state.brand_product_mapping = s3_manager.load_brand_product_mapping()
+                    _bump_mapping_version()
 
                 # Show what was loaded
                 loaded_items = []
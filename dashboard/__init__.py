@@ -46,6 +46,7 @@ Usage:
 from .core.config import (
     STORE_MAPPING,
     STORE_DISPLAY_NAMES,
+    STORE_ID_BY_DISPLAY,
     SAMPLE_PREFIXES,
     AppConfig,
 )
@@ -183,6 +184,7 @@ __all__ = [
     # Configuration
     'STORE_MAPPING',
     'STORE_DISPLAY_NAMES',
+    'STORE_ID_BY_DISPLAY',
     'SAMPLE_PREFIXES',
     'AppConfig',
 
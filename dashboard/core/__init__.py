@@ -11,6 +11,7 @@ from .cache import (
 from .config import (
     STORE_MAPPING,
     STORE_DISPLAY_NAMES,
+    STORE_ID_BY_DISPLAY,
     SAMPLE_PREFIXES,
     AppConfig
 )
@@ -50,6 +51,7 @@ __all__ = [
     # Config
     'STORE_MAPPING',
     'STORE_DISPLAY_NAMES',
+    'STORE_ID_BY_DISPLAY',
     'SAMPLE_PREFIXES',
     'AppConfig',
     # Utils
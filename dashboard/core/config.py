@@ -18,9 +18,12 @@ STORE_DISPLAY_NAMES = {
     "grass_roots": "Grass Roots"
 }
 
+# Reverse lookup from display name to store ID for store filters
+STORE_ID_BY_DISPLAY = {name: store_id for store_id, name in STORE_DISPLAY_NAMES.items()}
+
 # Sample prefixes to filter out (not actual sales)
 # [DS] = Display Samples, [SS] = Staff Samples
-SAMPLE_PREFIXES = ["[DS]", "[SS]"]
+SAMPLE_PREFIXES = ("[DS]", "[SS]")
 
 
 @dataclass
@@ -13,6 +13,7 @@ Author: Generated for stellyes/retail-analytics-dashboard
 
 import streamlit as st
 import boto3
+from botocore.config import Config
 import pandas as pd
 import hashlib
 import json
@@ -31,19 +32,28 @@ logger = logging.getLogger(__name__)
 # S3 Client Management (Cached Resource)
 # =============================================================================
 
+# Connection pool sized for parallel fetches, kept alive across reruns,
+# with adaptive client-side rate limiting on throttled retries
+S3_CLIENT_CONFIG = Config(
+    retries={'max_attempts': 5, 'mode': 'adaptive'},
+    max_pool_connections=32,
+    tcp_keepalive=True
+)
+
+
 @st.cache_resource
 def get_s3_client():
     """
     Get a cached S3 client instance.
     Using @st.cache_resource ensures the client is created once and reused.
     """
-    return boto3.client('s3')
+    return boto3.client('s3', config=S3_CLIENT_CONFIG)
 
 
 @st.cache_resource
 def get_s3_resource():
     """Get a cached S3 resource instance for higher-level operations."""
-    return boto3.resource('s3')
+    return boto3.resource('s3', config=S3_CLIENT_CONFIG)
 
 
 # =============================================================================
@@ -298,15 +308,13 @@ class OptimizedDataLoader:
             partition_prefix = f"{prefix}/{current_date.strftime(date_format)}/"
             
             try:
-                response = self.s3_client.list_objects_v2(
-                    Bucket=self.bucket_name,
-                    Prefix=partition_prefix
-                )
-                
-                for obj in response.get('Contents', []):
-                    data = self.load_json(obj['Key'])
-                    if data:
-                        results.append(data)
+                # Paginate so partitions with more than 1000 objects are not truncated
+                paginator = self.s3_client.get_paginator('list_objects_v2')
+                for page in paginator.paginate(Bucket=self.bucket_name, Prefix=partition_prefix):
+                    for obj in page.get('Contents', []):
+                        data = self.load_json(obj['Key'])
+                        if data:
+                            results.append(data)
                         
             except Exception as e:
                 logger.warning(f"Error loading partition {partition_prefix}: {e}")
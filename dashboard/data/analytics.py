@@ -5,14 +5,17 @@ Analytics engine for generating insights and recommendations.
 from typing import Dict, List
 import pandas as pd
 
+from ..core.cache import cached_data_loader
+
 # Import store display names - use relative import within package
 try:
-    from ..core.config import STORE_DISPLAY_NAMES
+    from ..core.config import STORE_DISPLAY_NAMES, STORE_ID_BY_DISPLAY
 except ImportError:
     STORE_DISPLAY_NAMES = {
         "barbary_coast": "Barbary Coast",
         "grass_roots": "Grass Roots"
     }
+    STORE_ID_BY_DISPLAY = {name: store_id for store_id, name in STORE_DISPLAY_NAMES.items()}
 
 
 class AnalyticsEngine:
@@ -20,25 +23,42 @@ class AnalyticsEngine:
 
     @staticmethod
     def calculate_store_metrics(df: pd.DataFrame) -> Dict:
-        """Calculate key metrics by store."""
-        metrics = {}
-
-        for store_id in df['Store_ID'].unique():
-            store_df = df[df['Store_ID'] == store_id]
-            store_name = STORE_DISPLAY_NAMES.get(store_id, store_id)
-
-            metrics[store_name] = {
-                'total_net_sales': store_df['Net Sales'].sum(),
-                'total_transactions': store_df['Tickets Count'].sum(),
-                'total_customers': store_df['Customers Count'].sum(),
-                'total_new_customers': store_df['New Customers'].sum(),
-                'avg_order_value': store_df['Avg Order Value'].mean(),
-                'avg_margin': store_df['Gross Margin %'].mean() * 100,
-                'avg_discount_rate': store_df['Discount %'].mean() * 100,
-                'units_sold': store_df['Units Sold'].sum(),
-            }
+        """Calculate key metrics by store in a single grouped reduction."""
+        grouped = df.groupby('Store_ID', sort=False, observed=True).agg(
+            total_net_sales=('Net Sales', 'sum'),
+            total_transactions=('Tickets Count', 'sum'),
+            total_customers=('Customers Count', 'sum'),
+            total_new_customers=('New Customers', 'sum'),
+            avg_order_value=('Avg Order Value', 'mean'),
+            avg_margin=('Gross Margin %', 'mean'),
+            avg_discount_rate=('Discount %', 'mean'),
+            units_sold=('Units Sold', 'sum'),
+        )
+
+        return {
+            STORE_DISPLAY_NAMES.get(store_id, store_id): store_metrics
+            for store_id, store_metrics in grouped.to_dict('index').items()
+        }
 
-        return metrics
+    @staticmethod
+    @cached_data_loader(ttl_seconds=3600)
+    def brand_summary(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Reduce brand rows to the ranking columns, sorted once by Net Sales.
+        Upload_Store is used as Store_ID when the frame has no Store_ID.
+        """
+        store_col = next(
+            (col for col in ('Store_ID', 'Upload_Store') if col in df.columns),
+            None
+        )
+        cols = ['Brand', 'Net Sales', 'Gross Margin %', '% of Total Net Sales']
+        summary = df[cols + [store_col]] if store_col else df[cols]
+        if store_col == 'Upload_Store':
+            summary = summary.rename(columns={'Upload_Store': 'Store_ID'})
+        # Stable sort keeps nlargest's first-seen order for tied sales
+        return summary.sort_values(
+            'Net Sales', ascending=False, kind='stable', ignore_index=True
+        )
 
     @staticmethod
     def identify_top_brands(
@@ -47,15 +67,13 @@ class AnalyticsEngine:
         store: str = None
     ) -> pd.DataFrame:
         """Identify top performing brands."""
+        summary = AnalyticsEngine.brand_summary(df)
         if store and store != 'All Stores':
-            store_id = [k for k, v in STORE_DISPLAY_NAMES.items() if v == store]
-            if store_id:
-                if 'Store_ID' in df.columns:
-                    df = df[df['Store_ID'] == store_id[0]]
-                elif 'Upload_Store' in df.columns:
-                    df = df[df['Upload_Store'] == store_id[0]]
-
-        return df.nlargest(n, 'Net Sales')[
+            store_id = STORE_ID_BY_DISPLAY.get(store)
+            if store_id and 'Store_ID' in summary.columns:
+                summary = summary[summary['Store_ID'] == store_id]
+
+        return summary.head(n)[
             ['Brand', 'Net Sales', 'Gross Margin %', '% of Total Net Sales']
         ]
 
@@ -65,10 +83,11 @@ class AnalyticsEngine:
         margin_threshold: float = 0.4
     ) -> pd.DataFrame:
         """Identify brands with low margins that might need attention."""
-        low_margin = df[
-            (df['Gross Margin %'] < margin_threshold) &
-            (df['Net Sales'] > 1000)
-        ].copy()
+        summary = AnalyticsEngine.brand_summary(df)
+        low_margin = summary[
+            (summary['Gross Margin %'] < margin_threshold) &
+            (summary['Net Sales'] > 1000)
+        ]
 
         return low_margin.nsmallest(10, 'Gross Margin %')[
             ['Brand', 'Net Sales', 'Gross Margin %']
@@ -152,9 +171,10 @@ class AnalyticsEngine:
 
         # Brand recommendations
         if brand_df is not None and len(brand_df) > 0:
-            high_margin_low_sales = brand_df[
-                (brand_df['Gross Margin %'] > 0.65) &
-                (brand_df['% of Total Net Sales'] < 0.01)
+            summary = AnalyticsEngine.brand_summary(brand_df)
+            high_margin_low_sales = summary[
+                (summary['Gross Margin %'] > 0.65) &
+                (summary['% of Total Net Sales'] < 0.01)
             ].head(5)
 
             if len(high_margin_low_sales) > 0:
@@ -3,24 +3,142 @@ Data processing and cleaning utilities.
 """
 
 from datetime import datetime
+from functools import reduce
+
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Import sample prefixes - use relative import within package
+try:
+    from ..core.config import SAMPLE_PREFIXES
+except ImportError:
+    SAMPLE_PREFIXES = ("[DS]", "[SS]")
+
+
+# Store_ID has a fixed vocabulary, so a shared categorical dtype keeps the
+# int8 codes intact when frames from several uploads are concatenated
+STORE_ID_DTYPE = pd.CategoricalDtype(['barbary_coast', 'grass_roots'])
+
+# Upload_Store also records uploads tagged as covering both stores
+UPLOAD_STORE_DTYPE = pd.CategoricalDtype([*STORE_ID_DTYPE.categories, 'combined'])
+
+# Date layouts seen in POS exports, tried in order against a sample value
+POS_DATE_FORMATS = ('%Y-%m-%d', '%m/%d/%Y', '%Y-%m-%d %H:%M:%S')
+
+# Sales columns narrowed after cleaning: small counts fit int32 and bounded
+# ratios need no more than float32. Currency columns stay float64.
+SALES_COUNT_COLUMNS = ['Tickets Count', 'Units Sold', 'Customers Count', 'New Customers']
+SALES_RATIO_COLUMNS = ['Gross Margin %', 'Discount %', 'Cost %']
+
+# Brand ratio columns (0-1) are narrowed the same way; brand currency stays float64
+BRAND_RATIO_COLUMNS = ['% of Total Net Sales', 'Gross Margin %']
+
+# Cleaned sales frames store SALES_RATIO_COLUMNS as percentages (0-100), not
+# the 0-1 ratios found in the POS export. Brand frames keep raw ratios.
+SALES_RATIO_SCALE = 100
+
+# Weekday labels in dt.dayofweek order (Monday=0)
+DAY_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
 
 
 class DataProcessor:
     """Processes and cleans uploaded CSV data."""
 
+    @staticmethod
+    def _coerce_numeric(df: pd.DataFrame, numeric_cols: list) -> pd.DataFrame:
+        """
+        Coerce the given columns to numeric in a single batched call.
+        Columns that are missing or already numeric (e.g. typed by the Arrow
+        reader) are skipped.
+        """
+        to_convert = [
+            col for col in numeric_cols
+            if col in df.columns and not pd.api.types.is_numeric_dtype(df[col])
+        ]
+        if to_convert:
+            df[to_convert] = df[to_convert].apply(pd.to_numeric, errors='coerce')
+        return df
+
+    @staticmethod
+    def _compact_dtypes(df: pd.DataFrame, category_cols: tuple = (), string_cols: tuple = ()) -> pd.DataFrame:
+        """
+        Store low-cardinality labels as category codes and free-text labels
+        as Arrow-backed strings. Missing columns are skipped.
+        """
+        for col in category_cols:
+            if col in df.columns:
+                df[col] = df[col].astype('category')
+        for col in string_cols:
+            if col in df.columns:
+                df[col] = df[col].astype('string[pyarrow]')
+        return df
+
+    @staticmethod
+    def _downcast_numeric(df: pd.DataFrame, int_cols: list, float_cols: list) -> pd.DataFrame:
+        """
+        Narrow numeric columns to 32-bit dtypes. Count columns with gaps or
+        fractional values become float32 rather than a nullable integer.
+        """
+        for col in int_cols:
+            if col in df.columns:
+                values = df[col]
+                whole = values.notna().all() and (values % 1 == 0).all()
+                df[col] = values.astype('int32' if whole else 'float32')
+        float_cols = [col for col in float_cols if col in df.columns]
+        if float_cols:
+            df[float_cols] = df[float_cols].astype('float32')
+        return df
+
+    @staticmethod
+    def _parse_dates(values: pd.Series) -> pd.Series:
+        """
+        Parse a date column with one explicit format picked from its first
+        non-null value, keeping pandas on the C strptime path. Columns the
+        Arrow reader already typed as timestamps pass through unchanged.
+        """
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return values
+
+        non_null = values.dropna()
+        sample = str(non_null.iloc[0]).strip() if len(non_null) else None
+        for fmt in POS_DATE_FORMATS:
+            try:
+                datetime.strptime(sample, fmt)
+            except (TypeError, ValueError):
+                continue
+            return pd.to_datetime(values, format=fmt, errors='raise', cache=True)
+
+        return pd.to_datetime(values, errors='raise', cache=True)
+
+    @staticmethod
+    def _sample_mask(brands: pd.Series) -> np.ndarray:
+        """
+        Boolean mask of sample records ([DS]/[SS] brand prefixes).
+        Evaluated with Arrow compute kernels over a contiguous string buffer.
+        """
+        arrow_brands = pa.array(brands.astype('string').to_numpy(na_value=''), type=pa.string())
+        is_sample = reduce(pc.or_, (pc.starts_with(arrow_brands, prefix) for prefix in SAMPLE_PREFIXES))
+        return is_sample.to_numpy(zero_copy_only=False)
+
     @staticmethod
     def clean_sales_by_store(df: pd.DataFrame) -> pd.DataFrame:
         """Clean and process Sales by Store data."""
-        df = df.copy()
+        # Convert date columns; assign builds a new frame so the caller's is untouched
+        df = df.assign(
+            Date=DataProcessor._parse_dates(df['Date']),
+            Week=DataProcessor._parse_dates(df['Week'])
+        )
 
-        # Convert date columns
-        df['Date'] = pd.to_datetime(df['Date'])
-        df['Week'] = pd.to_datetime(df['Week'])
+        # Weekday as ordered category codes, derived once here instead of per render
+        day_codes = df['Date'].dt.dayofweek.fillna(-1).astype('int8')
+        df['Day_of_Week'] = pd.Categorical.from_codes(day_codes, categories=DAY_ORDER, ordered=True)
 
         # Extract store identifier
-        df['Store_ID'] = df['Store'].apply(lambda x:
-            'grass_roots' if 'Grass Roots' in str(x) else 'barbary_coast'
+        is_grass_roots = df['Store'].astype('string').str.contains('Grass Roots', regex=False, na=False)
+        df['Store_ID'] = pd.Categorical(
+            np.where(is_grass_roots, 'grass_roots', 'barbary_coast'), dtype=STORE_ID_DTYPE
         )
 
         # Ensure numeric columns
@@ -32,61 +150,62 @@ class DataProcessor:
             'Avg Basket Size', 'Avg Order Value', 'Avg Order Profit'
         ]
 
-        for col in numeric_cols:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
+        df = DataProcessor._coerce_numeric(df, numeric_cols)
+        df = DataProcessor._downcast_numeric(df, SALES_COUNT_COLUMNS, SALES_RATIO_COLUMNS)
+
+        # Scale ratios to percentages once so consumers read them directly
+        ratio_cols = [col for col in SALES_RATIO_COLUMNS if col in df.columns]
+        df[ratio_cols] = (df[ratio_cols] * SALES_RATIO_SCALE).astype('float32')
+        df = DataProcessor._compact_dtypes(df, category_cols=('Store',))
 
         return df.sort_values('Date')
 
     @staticmethod
     def clean_brand_data(df: pd.DataFrame) -> pd.DataFrame:
         """Clean and process Net Sales by Brand data."""
-        df = df.copy()
-
         # Handle column name change: Treez renamed 'Brand' to 'Product Brand'
         if 'Product Brand' in df.columns and 'Brand' not in df.columns:
             df = df.rename(columns={'Product Brand': 'Brand'})
 
+        # Clean brand name once; the sample filter below reads the same stripped values
+        brand_clean = df['Brand'].str.strip()
+
         # Filter out sample records ([DS] = Display Samples, [SS] = Staff Samples)
-        original_count = len(df)
-        df = df[~df['Brand'].str.startswith(('[DS]', '[SS]'), na=False)]
-        filtered_count = original_count - len(df)
+        is_sample = DataProcessor._sample_mask(brand_clean)
+        df = df[~is_sample].assign(Brand_Clean=brand_clean[~is_sample])
 
+        filtered_count = int(is_sample.sum())
         if filtered_count > 0:
             print(f"Filtered out {filtered_count} sample records ([DS]/[SS])")
 
-        # Clean brand name
-        df['Brand_Clean'] = df['Brand'].str.strip()
-
         # Ensure numeric columns
         numeric_cols = ['% of Total Net Sales', 'Gross Margin %', 'Avg Cost (w/o excise)', 'Net Sales']
-        for col in numeric_cols:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
+        df = DataProcessor._coerce_numeric(df, numeric_cols)
 
         # Filter out rows with zero or negative net sales
         df = df[df['Net Sales'] > 0]
+        df = DataProcessor._downcast_numeric(df, [], BRAND_RATIO_COLUMNS)
+        df = DataProcessor._compact_dtypes(df, string_cols=('Brand', 'Brand_Clean'))
 
         return df
 
     @staticmethod
     def clean_product_data(df: pd.DataFrame) -> pd.DataFrame:
         """Clean and process Net Sales by Product data."""
-        df = df.copy()
-        df['Net Sales'] = pd.to_numeric(df['Net Sales'], errors='coerce')
+        df = df.assign(**{'Net Sales': pd.to_numeric(df['Net Sales'], errors='coerce')})
+        df = DataProcessor._compact_dtypes(df, category_cols=('Product Type',))
         return df.sort_values('Net Sales', ascending=False)
 
     @staticmethod
     def clean_customer_data(df: pd.DataFrame) -> pd.DataFrame:
         """Clean and process customer data."""
-        df = df.copy()
-
-        # Remove BOM if present
-        df.columns = [col.strip().replace('\ufeff', '') for col in df.columns]
+        # Remove BOM if present (rename returns a new frame; the caller's is untouched)
+        df = df.rename(columns=lambda col: col.strip().replace('\ufeff', ''))
 
         # Extract store identifier
-        df['Store_ID'] = df['Store Name'].apply(lambda x:
-            'grass_roots' if 'Grass Roots' in str(x) else 'barbary_coast'
+        is_grass_roots = df['Store Name'].astype('string').str.contains('Grass Roots', regex=False, na=False)
+        df['Store_ID'] = pd.Categorical(
+            np.where(is_grass_roots, 'grass_roots', 'barbary_coast'), dtype=STORE_ID_DTYPE
         )
 
         # Convert date columns
@@ -117,9 +236,7 @@ class DataProcessor:
             'Rewards Points Balance', 'Reward Points ($) Balance'
         ]
 
-        for col in numeric_cols:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
+        df = DataProcessor._coerce_numeric(df, numeric_cols)
 
         # Create customer segments based on lifetime value
         df['Customer Segment'] = pd.cut(
@@ -143,10 +260,8 @@ class DataProcessor:
     @staticmethod
     def clean_invoice_data(df: pd.DataFrame) -> pd.DataFrame:
         """Clean and process invoice/purchase order data."""
-        df = df.copy()
-
-        # Remove BOM if present
-        df.columns = [col.strip().replace('\ufeff', '') for col in df.columns]
+        # Remove BOM if present (rename returns a new frame; the caller's is untouched)
+        df = df.rename(columns=lambda col: col.strip().replace('\ufeff', ''))
 
         # Convert date columns if present
         date_cols = ['Invoice Date', 'Order Date', 'Delivery Date', 'Due Date']
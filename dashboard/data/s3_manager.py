@@ -3,16 +3,116 @@ S3 Data Manager for persistent storage and retrieval.
 """
 
 import io
+import os
 import re
 import json
 import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
+from ..core.cache import cached_data_loader
+from .processor import UPLOAD_STORE_DTYPE
+
+# Processed data is persisted as Parquet (Snappy) unless LEGACY_CSV is set
+LEGACY_CSV = bool(os.environ.get("LEGACY_CSV"))
+
+# Chunk sizes used when streaming S3 bodies
+STREAM_CHUNK_BYTES = 1 << 20
+PARQUET_BATCH_ROWS = 64_000
+
+# Upload keys embed their report period: type_YYYYMMDD-YYYYMMDD_timestamp.csv
+UPLOAD_DATE_RANGE_RE = re.compile(r'_(\d{8})-(\d{8})_')
+
+# Numeric Treez report columns are typed up front for the Arrow CSV reader, so
+# a column that is blank in the first block cannot fail type inference later in
+# the file and force the pandas fallback (a second GET and a slower parse)
+REPORT_COLUMN_TYPES = {
+    col: pa.float64() for col in (
+        'Tickets Count', 'Units Sold', 'Customers Count', 'New Customers',
+        'Gross Sales', 'Discounts', 'Returns', 'Net Sales', 'Taxes',
+        'Gross Receipts', 'COGS (with excise)', 'Gross Income',
+        'Gross Margin %', 'Discount %', 'Cost %',
+        'Avg Basket Size', 'Avg Order Value', 'Avg Order Profit',
+        '% of Total Net Sales', 'Avg Cost (w/o excise)'
+    )
+}
+
+# Multipart settings for buffered downloads (ranged GETs in 8 MiB parts)
+S3_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=16 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=8,
+    use_threads=True
+)
+
+# Multipart settings for uploads: anything over 8 MiB is sent as 16 MiB parts
+# on parallel threads, read straight from the file object
+S3_UPLOAD_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=16 * 1024 * 1024,
+    max_concurrency=8,
+    use_threads=True
+)
+
+# Upper bound on concurrent object fetches when loading many files at once
+S3_DOWNLOAD_WORKERS = 16
+
+
+@lru_cache(maxsize=8)
+def _get_s3_client(access_key: str, secret_key: str, region: str):
+    """
+    Get a pooled S3 client for the given credentials.
+
+    The client is created once per process so Streamlit reruns reuse its
+    keep-alive connection pool instead of paying a new TLS handshake.
+    """
+    boto_config = Config(
+        connect_timeout=5,
+        read_timeout=10,
+        retries={'max_attempts': 2, 'mode': 'adaptive'},
+        max_pool_connections=32,
+        tcp_keepalive=True
+    )
+    return boto3.client(
+        's3',
+        aws_access_key_id=access_key,
+        aws_secret_access_key=secret_key,
+        region_name=region,
+        config=boto_config
+    )
+
+
+@cached_data_loader(ttl_seconds=3600)
+def _load_cleaned_file(
+    bucket_name: str,
+    s3_key: str,
+    etag: str,
+    clean_method: str,
+    _s3_manager: 'S3DataManager',
+    _processor
+) -> Optional[pd.DataFrame]:
+    """
+    Download and clean a single S3 file.
+
+    Cached on (bucket, key, ETag, cleaner) so unchanged files are neither
+    downloaded nor re-cleaned on later reruns.
+    """
+    df = _s3_manager.download_file(s3_key)
+    if df is None or df.empty:
+        return None
+    return getattr(_processor, clean_method)(df)
+
 
 class S3DataManager:
     """Manages data persistence with AWS S3."""
@@ -64,20 +164,7 @@ class S3DataManager:
             self.bucket_name = bucket
 
             if access_key and secret_key:
-                from botocore.config import Config
-                # Configure timeouts to prevent hanging on network issues
-                boto_config = Config(
-                    connect_timeout=5,
-                    read_timeout=10,
-                    retries={'max_attempts': 2}
-                )
-                self.s3_client = boto3.client(
-                    's3',
-                    aws_access_key_id=access_key,
-                    aws_secret_access_key=secret_key,
-                    region_name=region,
-                    config=boto_config
-                )
+                self.s3_client = _get_s3_client(access_key, secret_key, region)
             else:
                 self.connection_error = "Missing AWS credentials"
                 return
@@ -111,7 +198,9 @@ class S3DataManager:
             return False, self.connection_error or "S3 not configured"
 
         try:
-            self.s3_client.upload_fileobj(file_obj, self.bucket_name, s3_key)
+            self.s3_client.upload_fileobj(
+                file_obj, self.bucket_name, s3_key, Config=S3_UPLOAD_CONFIG
+            )
             return True, f"Uploaded to s3://{self.bucket_name}/{s3_key}"
         except ClientError as e:
             error_code = e.response.get('Error', {}).get('Code', 'Unknown')
@@ -120,25 +209,172 @@ class S3DataManager:
         except Exception as e:
             return False, f"Upload failed: {e}"
 
-    def download_file(self, s3_key: str) -> Optional[pd.DataFrame]:
-        """Download a CSV file from S3 and return as DataFrame."""
+    def generate_presigned_put(
+        self,
+        s3_key: str,
+        expires: int = 900,
+        content_type: str = "text/csv"
+    ) -> Optional[str]:
+        """
+        Create a short-lived URL the browser can PUT a file to directly.
+
+        Args:
+            s3_key: Destination object key
+            expires: URL lifetime in seconds
+            content_type: Content-Type the uploader must send
+
+        Returns:
+            Presigned URL, or None if S3 is not configured or signing fails
+        """
         if not self.is_configured():
             return None
         try:
-            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=s3_key)
-            return pd.read_csv(io.BytesIO(response['Body'].read()), low_memory=False)
+            return self.s3_client.generate_presigned_url(
+                'put_object',
+                Params={'Bucket': self.bucket_name, 'Key': s3_key, 'ContentType': content_type},
+                ExpiresIn=expires
+            )
+        except ClientError:
+            return None
+
+    def download_file(
+        self,
+        s3_key: str,
+        columns: Optional[List[str]] = None
+    ) -> Optional[pd.DataFrame]:
+        """
+        Download a CSV or Parquet file from S3 and return as DataFrame.
+
+        Args:
+            s3_key: S3 object key (.parquet keys are read as Parquet)
+            columns: Optional column subset to read
+        """
+        if not self.is_configured():
+            return None
+        try:
+            return self._read_object(s3_key, columns)
         except ClientError as e:
             if e.response['Error']['Code'] == 'NoSuchKey':
                 return None
             return None
 
+    def _read_object(
+        self,
+        s3_key: str,
+        columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Stream an S3 object into a DataFrame without materializing the body twice.
+
+        CSV bodies are decoded incrementally into Arrow record batches. Parquet
+        needs random access to its footer, so the body is buffered once and
+        converted batch by batch.
+        """
+        if s3_key.endswith('.parquet'):
+            buffer = io.BytesIO()
+            self.s3_client.download_fileobj(
+                self.bucket_name, s3_key, buffer, Config=S3_TRANSFER_CONFIG
+            )
+            parquet_file = pq.ParquetFile(pa.BufferReader(buffer.getbuffer()))
+            batches = list(parquet_file.iter_batches(batch_size=PARQUET_BATCH_ROWS, columns=columns))
+            table = pa.Table.from_batches(batches) if batches else parquet_file.read(columns=columns)
+            return table.to_pandas(self_destruct=True, split_blocks=True)
+
+        response = self.s3_client.get_object(Bucket=self.bucket_name, Key=s3_key)
+        try:
+            # Blank text cells load as null, matching pd.read_csv and the upload path
+            convert_options = pa_csv.ConvertOptions(
+                include_columns=columns, column_types=REPORT_COLUMN_TYPES,
+                strings_can_be_null=True, quoted_strings_can_be_null=True
+            )
+            reader = pa_csv.open_csv(response['Body'], convert_options=convert_options)
+            table = pa.Table.from_batches(list(reader), schema=reader.schema)
+            return table.to_pandas(self_destruct=True, split_blocks=True)
+        except pa.ArrowInvalid:
+            # Type inference from the first block failed later in the file;
+            # re-fetch and let pandas parse the whole file.
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=s3_key)
+            body = response['Body']
+            buffer = io.BytesIO()
+            for chunk in iter(lambda: body.read(STREAM_CHUNK_BYTES), b''):
+                buffer.write(chunk)
+            buffer.seek(0)
+            return pd.read_csv(buffer, usecols=columns, low_memory=False)
+
+    def download_many(self, s3_keys: List[str]) -> Dict[str, Optional[pd.DataFrame]]:
+        """
+        Download several files concurrently.
+
+        Args:
+            s3_keys: S3 object keys to fetch
+
+        Returns:
+            Mapping of each key to its DataFrame (None if it failed to load)
+        """
+        return self._map_parallel(self.download_file, s3_keys)
+
+    def _map_parallel(
+        self,
+        fn: Callable[[str], Optional[pd.DataFrame]],
+        s3_keys: List[str]
+    ) -> Dict[str, Optional[pd.DataFrame]]:
+        """
+        Apply fn to each key on a thread pool and map each key to its result.
+
+        S3 reads are latency-bound and release the GIL while waiting on
+        sockets, so per-file round trips overlap instead of queueing.
+        When running under Streamlit, worker threads inherit the script run
+        context so cached loaders such as _load_cleaned_file work inside fn.
+        """
+        if not s3_keys:
+            return {}
+
+        pool_kwargs = {}
+        try:
+            from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+            pool_kwargs = {'initializer': add_script_run_ctx, 'initargs': (None, get_script_run_ctx())}
+        except ImportError:
+            pass
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=min(S3_DOWNLOAD_WORKERS, len(s3_keys)), **pool_kwargs) as executor:
+            futures = {executor.submit(fn, key): key for key in s3_keys}
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    results[key] = future.result()
+                except Exception as e:
+                    print(f"Error loading {key}: {e}")
+                    results[key] = None
+        return results
+
+    def iter_files(self, prefix: str = "") -> Iterator[str]:
+        """Lazily yield file keys in S3 bucket with given prefix, across all pages."""
+        if not self.is_configured():
+            return
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            for obj in page.get('Contents', []):
+                yield obj['Key']
+
+    def list_file_etags(self, prefix: str = "") -> Dict[str, str]:
+        """Map file keys with given prefix to their ETags."""
+        if not self.is_configured():
+            return {}
+        try:
+            paginator = self.s3_client.get_paginator('list_objects_v2')
+            return {
+                obj['Key']: obj['ETag']
+                for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix)
+                for obj in page.get('Contents', [])
+            }
+        except ClientError:
+            return {}
+
     def list_files(self, prefix: str = "") -> List[str]:
         """List files in S3 bucket with given prefix."""
-        if not self.is_configured():
-            return []
         try:
-            response = self.s3_client.list_objects_v2(Bucket=self.bucket_name, Prefix=prefix)
-            return [obj['Key'] for obj in response.get('Contents', [])]
+            return list(self.iter_files(prefix))
         except ClientError:
             return []
 
@@ -148,12 +384,16 @@ class S3DataManager:
         data_type: str,
         store: str = "combined"
     ) -> Tuple[bool, str]:
-        """Save processed data to S3."""
+        """Save processed data to S3 as Parquet (or CSV when LEGACY_CSV is set)."""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        s3_key = f"processed/{store}/{data_type}_{timestamp}.csv"
+        extension = "csv" if LEGACY_CSV else "parquet"
+        s3_key = f"processed/{store}/{data_type}_{timestamp}.{extension}"
 
         buffer = io.BytesIO()
-        df.to_csv(buffer, index=False)
+        if LEGACY_CSV:
+            df.to_csv(buffer, index=False)
+        else:
+            df.to_parquet(buffer, engine='pyarrow', compression='snappy', index=False)
         buffer.seek(0)
 
         return self.upload_file(buffer, s3_key)
@@ -167,8 +407,13 @@ class S3DataManager:
 
         try:
             mapping_json = json.dumps(mapping, indent=2)
-            buffer = io.BytesIO(mapping_json.encode('utf-8'))
-            self.s3_client.upload_fileobj(buffer, self.bucket_name, s3_key)
+            # A few KB of JSON: one PutObject, without spinning up the transfer manager's threads
+            self.s3_client.put_object(
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                Body=mapping_json.encode('utf-8'),
+                ContentType='application/json'
+            )
             return True, f"Saved mapping to s3://{self.bucket_name}/{s3_key}"
         except ClientError as e:
             error_msg = e.response.get('Error', {}).get('Message', str(e))
@@ -268,53 +513,67 @@ class S3DataManager:
         }
 
         try:
-            files = self.list_files(prefix="raw-uploads/")
+            file_etags = self.list_file_etags(prefix="raw-uploads/")
+            files = list(file_etags)
 
             if not files:
                 return result
 
-            # Group files by type
-            sales_files = [f for f in files if '/sales_' in f and f.endswith('.csv')]
-            brand_files = [f for f in files if '/brand_' in f and f.endswith('.csv')]
-            product_files = [f for f in files if '/product_' in f and f.endswith('.csv')]
-            customer_files = [f for f in files if '/customers_' in f and f.endswith('.csv')]
-            invoice_files = [f for f in files if '/invoices_' in f and f.endswith('.csv')]
+            # Group files by type in one pass, keyed on the filename's type prefix
+            files_by_kind = {kind: [] for kind in ('sales', 'brand', 'product', 'customers', 'invoices')}
+            for f in files:
+                if f.endswith('.csv'):
+                    kind = f.rsplit('/', 1)[-1].split('_', 1)[0]
+                    if kind in files_by_kind:
+                        files_by_kind[kind].append(f)
+            sales_files = files_by_kind['sales']
+            brand_files = files_by_kind['brand']
+            product_files = files_by_kind['product']
+            customer_files = files_by_kind['customers']
+            invoice_files = files_by_kind['invoices']
+
+            # Download and clean every typed file concurrently up front
+            clean_methods = {
+                **{f: 'clean_sales_by_store' for f in sales_files},
+                **{f: 'clean_brand_data' for f in brand_files},
+                **{f: 'clean_product_data' for f in product_files},
+                **{f: 'clean_customer_data' for f in customer_files},
+                **{f: 'clean_invoice_data' for f in invoice_files},
+            }
+            cleaned = self._map_parallel(
+                lambda f: self._load_cleaned_file(f, file_etags.get(f, ''), clean_methods[f], processor),
+                list(clean_methods)
+            )
 
             # Load and merge sales data
             if sales_files:
                 sales_dfs = []
                 for f in sales_files:
                     try:
-                        df = self.download_file(f)
+                        df = cleaned.get(f)
                         if df is not None and not df.empty:
                             store_id = self._extract_store_from_path(f)
-                            df = processor.clean_sales_by_store(df)
                             if store_id and store_id != 'combined':
-                                df['Upload_Store'] = store_id
+                                df['Upload_Store'] = pd.Series(store_id, index=df.index, dtype=UPLOAD_STORE_DTYPE)
                             sales_dfs.append(df)
                     except Exception as e:
                         print(f"Error loading {f}: {e}")
                         continue
 
                 if sales_dfs:
-                    result['sales'] = pd.concat(sales_dfs, ignore_index=True)
-                    result['sales'] = result['sales'].drop_duplicates(
-                        subset=['Store', 'Date'],
-                        keep='last'
-                    )
+                    result['sales'] = self._concat_keep_last(sales_dfs, ['Store', 'Date'])
 
             # Load and merge brand data
             if brand_files:
                 brand_dfs = []
                 for f in brand_files:
                     try:
-                        df = self.download_file(f)
+                        df = cleaned.get(f)
                         if df is not None and not df.empty:
                             store_id = self._extract_store_from_path(f)
                             date_range = self._extract_date_range_from_path(f)
 
-                            df = processor.clean_brand_data(df)
-                            df['Upload_Store'] = store_id
+                            df['Upload_Store'] = pd.Series(store_id, index=df.index, dtype=UPLOAD_STORE_DTYPE)
 
                             if date_range:
                                 df['Upload_Start_Date'] = pd.to_datetime(date_range[0])
@@ -326,25 +585,21 @@ class S3DataManager:
                         continue
 
                 if brand_dfs:
-                    result['brand'] = pd.concat(brand_dfs, ignore_index=True)
-                    if 'Upload_Start_Date' in result['brand'].columns:
-                        result['brand'] = result['brand'].drop_duplicates(
-                            subset=['Brand', 'Upload_Store', 'Upload_Start_Date'],
-                            keep='last'
-                        )
+                    result['brand'] = self._concat_keep_last(
+                        brand_dfs, ['Brand', 'Upload_Store', 'Upload_Start_Date']
+                    )
 
             # Load and merge product data
             if product_files:
                 product_dfs = []
                 for f in product_files:
                     try:
-                        df = self.download_file(f)
+                        df = cleaned.get(f)
                         if df is not None and not df.empty:
                             store_id = self._extract_store_from_path(f)
                             date_range = self._extract_date_range_from_path(f)
 
-                            df = processor.clean_product_data(df)
-                            df['Upload_Store'] = store_id
+                            df['Upload_Store'] = pd.Series(store_id, index=df.index, dtype=UPLOAD_STORE_DTYPE)
 
                             if date_range:
                                 df['Upload_Start_Date'] = pd.to_datetime(date_range[0])
@@ -356,24 +611,20 @@ class S3DataManager:
                         continue
 
                 if product_dfs:
-                    result['product'] = pd.concat(product_dfs, ignore_index=True)
-                    if 'Upload_Start_Date' in result['product'].columns:
-                        result['product'] = result['product'].drop_duplicates(
-                            subset=['Product Type', 'Upload_Store', 'Upload_Start_Date'],
-                            keep='last'
-                        )
+                    result['product'] = self._concat_keep_last(
+                        product_dfs, ['Product Type', 'Upload_Store', 'Upload_Start_Date']
+                    )
 
             # Load and merge customer data
             if customer_files:
                 customer_dfs = []
                 for f in customer_files:
                     try:
-                        df = self.download_file(f)
+                        df = cleaned.get(f)
                         if df is not None and not df.empty:
                             store_id = self._extract_store_from_path(f)
 
-                            df = processor.clean_customer_data(df)
-                            df['Upload_Store'] = store_id
+                            df['Upload_Store'] = pd.Series(store_id, index=df.index, dtype=UPLOAD_STORE_DTYPE)
                             df['Upload_Date'] = pd.to_datetime(datetime.now())
 
                             customer_dfs.append(df)
@@ -398,13 +649,12 @@ class S3DataManager:
                 invoice_dfs = []
                 for f in invoice_files:
                     try:
-                        df = self.download_file(f)
+                        df = cleaned.get(f)
                         if df is not None and not df.empty:
                             store_id = self._extract_store_from_path(f)
                             date_range = self._extract_date_range_from_path(f)
 
-                            df = processor.clean_invoice_data(df)
-                            df['Upload_Store'] = store_id
+                            df['Upload_Store'] = pd.Series(store_id, index=df.index, dtype=UPLOAD_STORE_DTYPE)
 
                             if date_range:
                                 df['Upload_Start_Date'] = pd.to_datetime(date_range[0])
@@ -429,6 +679,42 @@ class S3DataManager:
 
         return result
 
+    def _load_cleaned_file(
+        self,
+        s3_key: str,
+        etag: str,
+        clean_method: str,
+        processor
+    ) -> Optional[pd.DataFrame]:
+        """Download and clean a file, reusing the cached result while its ETag is unchanged."""
+        return _load_cleaned_file(
+            self.bucket_name, s3_key, etag, clean_method, self, processor
+        )
+
+    @staticmethod
+    def _concat_keep_last(frames: List[pd.DataFrame], key_cols: List[str]) -> pd.DataFrame:
+        """
+        Concatenate per-file frames keeping only the last row per key, like
+        concat + drop_duplicates(keep='last'), but superseded rows are dropped
+        from each file before the wide concat so they are never copied.
+        Frames are left undeduplicated when none of them carries the key columns.
+        """
+        has_keys = [set(key_cols).issubset(frame.columns) for frame in frames]
+        if not any(has_keys):
+            return pd.concat(frames, ignore_index=True)
+        if not all(has_keys):
+            return pd.concat(frames, ignore_index=True).drop_duplicates(subset=key_cols, keep='last')
+
+        # Resolve duplicates on the narrow key columns only, then split the mask per file
+        keys = pd.concat([frame[key_cols] for frame in frames], ignore_index=True)
+        superseded = keys.duplicated(keep='last').to_numpy()
+        kept, start = [], 0
+        for frame in frames:
+            end = start + len(frame)
+            kept.append(frame[~superseded[start:end]])
+            start = end
+        return pd.concat(kept, ignore_index=True)
+
     def _extract_store_from_path(self, path: str) -> str:
         """Extract store ID from S3 file path."""
         parts = path.split('/')
@@ -439,14 +725,14 @@ class S3DataManager:
     def _extract_date_range_from_path(self, path: str) -> Optional[Tuple[datetime, datetime]]:
         """Extract date range from S3 file path."""
         filename = path.split('/')[-1]
-        match = re.search(r'_(\d{8})-(\d{8})_', filename)
+        match = UPLOAD_DATE_RANGE_RE.search(filename)
 
         if match:
-            start_str = match.group(1)
-            end_str = match.group(2)
             try:
-                start_date = datetime.strptime(start_str, '%Y%m%d')
-                end_date = datetime.strptime(end_str, '%Y%m%d')
+                # Fixed-width YYYYMMDD, so slice instead of running strptime
+                start_date, end_date = (
+                    datetime(int(s[:4]), int(s[4:6]), int(s[6:8])) for s in match.groups()
+                )
                 return (start_date, end_date)
             except ValueError:
                 pass
@@ -5,15 +5,13 @@ Includes prompt optimization and response caching for cost efficiency.
 """
 
 import os
+from importlib.util import find_spec
 from typing import Optional, Any
 import json
 from datetime import datetime, date
 
-try:
-    import anthropic
-    ANTHROPIC_AVAILABLE = True
-except ImportError:
-    ANTHROPIC_AVAILABLE = False
+# anthropic pulls in httpx/pydantic, so it is only imported when a client is built
+ANTHROPIC_AVAILABLE = find_spec("anthropic") is not None
 
 # Import prompt optimization utilities
 try:
@@ -162,6 +160,7 @@ class ClaudeAnalytics:
         key = api_key or os.environ.get("ANTHROPIC_API_KEY")
         if key:
             try:
+                import anthropic
                 self.client = anthropic.Anthropic(api_key=key)
             except Exception as e:
                 self.init_error = f"Failed to initialize Anthropic client: {e}"
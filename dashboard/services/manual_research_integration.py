@@ -8,6 +8,7 @@ import streamlit as st
 import boto3
 from botocore.exceptions import ClientError
 import os
+from importlib.util import find_spec
 from datetime import datetime
 import json
 from typing import List, Dict
@@ -15,11 +16,8 @@ import hashlib
 from bs4 import BeautifulSoup
 import re
 
-try:
-    import anthropic
-    ANTHROPIC_AVAILABLE = True
-except ImportError:
-    ANTHROPIC_AVAILABLE = False
+# anthropic pulls in httpx/pydantic, so it is only imported when a client is built
+ANTHROPIC_AVAILABLE = find_spec("anthropic") is not None
 
 # =============================================================================
 # CONFIGURATION
@@ -216,6 +214,7 @@ class ManualResearchAnalyzer:
         if not ANTHROPIC_AVAILABLE:
             raise ImportError("anthropic package not installed")
 
+        import anthropic
         self.client = anthropic.Anthropic(api_key=api_key)
         # Use Haiku for cost efficiency - ~95% cheaper than Sonnet
         self.model = "claude-haiku-4-5-20251001"
@@ -1053,6 +1052,7 @@ class MonthlyResearchSummarizer:
         if not ANTHROPIC_AVAILABLE:
             raise ImportError("anthropic package not installed")
 
+        import anthropic
         self.client = anthropic.Anthropic(api_key=api_key)
         self.model = "claude-sonnet-4-20250514"  # Sonnet 4 for comprehensive analysis
         self.bucket_name = bucket_name or S3_BUCKET
@@ -10,12 +10,10 @@ import json
 from datetime import datetime, timedelta
 from typing import Optional, List
 import os
+from importlib.util import find_spec
 
-try:
-    import anthropic
-    ANTHROPIC_AVAILABLE = True
-except ImportError:
-    ANTHROPIC_AVAILABLE = False
+# anthropic pulls in httpx/pydantic, so it is only imported when a client is built
+ANTHROPIC_AVAILABLE = find_spec("anthropic") is not None
 
 # Configuration
 S3_BUCKET = os.environ.get("S3_BUCKET_NAME", "retail-data-bcgr")
@@ -166,6 +164,7 @@ class ManualSEOAnalyzer:
         if not ANTHROPIC_AVAILABLE:
             raise ImportError("anthropic package not installed")
 
+        import anthropic
         self.client = anthropic.Anthropic(api_key=api_key)
         self.model = "claude-haiku-4-5-20251001"  # Cost-effective for SEO
         self.bucket = S3_BUCKET
@@ -1026,6 +1025,7 @@ def _generate_monthly_seo_summary(viewer: SEOFindingsViewer, year: int, month: i
         findings_text += "\n"
 
     # Generate summary with Claude
+    import anthropic
     client = anthropic.Anthropic(api_key=api_key)
 
     prompt = f"""Analyze the following SEO data and create a comprehensive monthly summary.
@@ -3,34 +3,58 @@ Authentication utilities for the Retail Analytics Dashboard.
 """
 
 import hashlib
+import hmac
+
 import streamlit as st
 
 
+# Default credentials used when secrets.toml has no [passwords] section
+_DEFAULT_CREDENTIALS = (("admin", "changeme123"), ("analyst", "viewonly456"))
+
+# Password hashes are either legacy SHA-256 hex digests or "scrypt$<hex>"
+SCRYPT_PREFIX = "scrypt$"
+_SCRYPT_SALT = b"retail-analytics-dashboard"
+
+
+def hash_password(password: str) -> str:
+    """Hash a password with scrypt for storage in secrets.toml."""
+    digest = hashlib.scrypt(password.encode(), salt=_SCRYPT_SALT, n=2**14, r=8, p=1)
+    return SCRYPT_PREFIX + digest.hex()
+
+
+def _verify_password(password: str, stored_hash: str) -> bool:
+    """Check a password against a stored scrypt or legacy SHA-256 hash in constant time."""
+    if stored_hash.startswith(SCRYPT_PREFIX):
+        entered_hash = hash_password(password)
+    else:
+        entered_hash = hashlib.sha256(password.encode()).hexdigest()
+    return hmac.compare_digest(entered_hash, stored_hash)
+
+
+@st.cache_resource
+def _get_users() -> dict:
+    """Load the users table once per process instead of on every rerun."""
+    try:
+        return dict(st.secrets["passwords"])
+    except Exception:
+        return {username: hash_password(password) for username, password in _DEFAULT_CREDENTIALS}
+
+
 def check_password() -> bool:
     """
     Returns True if the user has entered a correct password.
 
     Uses Streamlit session state to track authentication status.
-    Passwords are stored as SHA-256 hashes in Streamlit secrets.
+    Passwords are stored in Streamlit secrets as scrypt hashes (see
+    hash_password) or legacy SHA-256 hashes.
     """
 
     def password_entered():
         """Checks whether a password entered by the user is correct."""
-        # Default passwords if secrets.toml not configured
-        default_users = {
-            "admin": hashlib.sha256("changeme123".encode()).hexdigest(),
-            "analyst": hashlib.sha256("viewonly456".encode()).hexdigest()
-        }
-
-        try:
-            users = st.secrets["passwords"]
-        except Exception:
-            users = default_users
-
-        entered_hash = hashlib.sha256(st.session_state["password"].encode()).hexdigest()
+        users = _get_users()
+        stored_hash = users.get(st.session_state["username"])
 
-        if (st.session_state["username"] in users and
-                users[st.session_state["username"]] == entered_hash):
+        if stored_hash and _verify_password(st.session_state["password"], stored_hash):
             st.session_state["password_correct"] = True
             st.session_state["logged_in_user"] = st.session_state["username"]
             del st.session_state["password"]
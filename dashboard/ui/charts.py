@@ -2,8 +2,7 @@
 Visualization components for the Retail Analytics Dashboard.
 """
 
-from typing import Dict
-
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
@@ -11,12 +10,59 @@ from plotly.subplots import make_subplots
 
 # Import store display names - use relative import within package
 try:
-    from ..core.config import STORE_DISPLAY_NAMES
+    from ..core.config import STORE_DISPLAY_NAMES, STORE_ID_BY_DISPLAY
 except ImportError:
     STORE_DISPLAY_NAMES = {
         "barbary_coast": "Barbary Coast",
         "grass_roots": "Grass Roots"
     }
+    STORE_ID_BY_DISPLAY = {name: store_id for store_id, name in STORE_DISPLAY_NAMES.items()}
+
+# Above this many points per trace, trend lines are drawn without markers
+TREND_MARKER_MAX_POINTS = 1000
+
+# Time-series traces are downsampled (LTTB) to at most this many points
+PLOT_MAX_POINTS = 2000
+
+
+def _lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: pick n_out point indices that preserve the
+    visual shape of (x, y). The first and last points are always kept.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    anchor = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs(
+            (x[anchor] - avg_x) * (y[start:end] - y[anchor])
+            - (x[anchor] - x[start:end]) * (avg_y - y[anchor])
+        )
+        anchor = start + int(np.argmax(area))
+        keep[i + 1] = anchor
+    return keep
+
+
+def _downsample_trace(x: pd.Series, y: pd.Series, max_points: int = PLOT_MAX_POINTS) -> tuple:
+    """Reduce an x-sorted series to at most max_points with LTTB before plotting."""
+    if len(y) <= max_points:
+        return x, y
+    if pd.api.types.is_datetime64_any_dtype(x):
+        x_num = x.to_numpy(dtype='datetime64[ns]').astype(np.int64).astype(np.float64)
+    else:
+        x_num = x.to_numpy(dtype=np.float64)
+    y_num = np.nan_to_num(y.to_numpy(dtype=np.float64))
+    keep = _lttb_indices(x_num, y_num, max_points)
+    return x.iloc[keep], y.iloc[keep]
 
 
 def plot_sales_trend(df: pd.DataFrame, store_filter: str = "All Stores") -> go.Figure:
@@ -31,9 +77,9 @@ def plot_sales_trend(df: pd.DataFrame, store_filter: str = "All Stores") -> go.F
         Plotly figure with sales and transaction trends
     """
     if store_filter != "All Stores":
-        store_id = [k for k, v in STORE_DISPLAY_NAMES.items() if v == store_filter]
+        store_id = STORE_ID_BY_DISPLAY.get(store_filter)
         if store_id:
-            df = df[df['Store_ID'] == store_id[0]]
+            df = df[df['Store_ID'] == store_id]
 
     # Filter out invalid data points
     df = df[
@@ -50,26 +96,31 @@ def plot_sales_trend(df: pd.DataFrame, store_filter: str = "All Stores") -> go.F
         vertical_spacing=0.1
     )
 
-    for store_id in df['Store_ID'].unique():
-        store_df = df[df['Store_ID'] == store_id]
+    # Sort once globally so each group is already in date order
+    df = df.sort_values('Date')
+
+    for store_id, store_df in df.groupby('Store_ID', sort=False, observed=True):
         store_name = STORE_DISPLAY_NAMES.get(store_id, store_id)
+        trace_mode = 'lines+markers' if len(store_df) <= TREND_MARKER_MAX_POINTS else 'lines'
+        sales_x, sales_y = _downsample_trace(store_df['Date'], store_df['Net Sales'])
+        tickets_x, tickets_y = _downsample_trace(store_df['Date'], store_df['Tickets Count'])
 
         fig.add_trace(
-            go.Scatter(
-                x=store_df['Date'],
-                y=store_df['Net Sales'],
+            go.Scattergl(
+                x=sales_x,
+                y=sales_y,
                 name=f'{store_name} Sales',
-                mode='lines+markers'
+                mode=trace_mode
             ),
             row=1, col=1
         )
 
         fig.add_trace(
-            go.Scatter(
-                x=store_df['Date'],
-                y=store_df['Tickets Count'],
+            go.Scattergl(
+                x=tickets_x,
+                y=tickets_y,
                 name=f'{store_name} Transactions',
-                mode='lines+markers'
+                mode=trace_mode
             ),
             row=2, col=1
         )
@@ -186,50 +237,34 @@ def plot_brand_performance(df: pd.DataFrame, top_n: int = 15) -> go.Figure:
     return fig
 
 
-def plot_store_comparison(metrics: Dict) -> go.Figure:
+def plot_store_comparison(metrics_df: pd.DataFrame) -> go.Figure:
     """
     Create store comparison dashboard.
 
     Args:
-        metrics: Dictionary of store metrics from AnalyticsEngine.calculate_store_metrics
+        metrics_df: One row per store, e.g.
+            pd.DataFrame.from_dict(AnalyticsEngine.calculate_store_metrics(df), orient='index')
 
     Returns:
         Plotly radar chart comparing stores
     """
-    stores = list(metrics.keys())
-
-    comparison_data = {
-        'Metric': ['Net Sales', 'Transactions', 'Avg Order Value', 'Gross Margin %', 'Units Sold'],
-    }
-
-    for store in stores:
-        comparison_data[store] = [
-            metrics[store]['total_net_sales'],
-            metrics[store]['total_transactions'],
-            metrics[store]['avg_order_value'],
-            metrics[store]['avg_margin'],
-            metrics[store]['units_sold']
-        ]
+    stores = metrics_df.index.tolist()
+    metric_labels = ['Net Sales', 'Transactions', 'Avg Order Value', 'Gross Margin %', 'Units Sold']
+    metric_cols = ['total_net_sales', 'total_transactions', 'avg_order_value', 'avg_margin', 'units_sold']
 
     fig = go.Figure()
 
-    # Normalized comparison
-    for store in stores:
-        values = comparison_data[store]
-        max_vals = [
-            max(comparison_data[s][i] for s in stores)
-            for i in range(len(values))
-        ]
-        normalized = [
-            v / m * 100 if m > 0 else 0
-            for v, m in zip(values, max_vals)
-        ]
-        normalized.append(normalized[0])  # Close the polygon
-
-        categories = comparison_data['Metric'] + [comparison_data['Metric'][0]]
+    # Normalize each metric against its max across stores
+    values = metrics_df[metric_cols].to_numpy(dtype=np.float64)
+    col_max = values.max(axis=0) if len(stores) else np.zeros(len(metric_cols))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        normalized = np.where(col_max > 0, values / col_max * 100.0, 0.0)
+
+    categories = metric_labels + [metric_labels[0]]
 
+    for idx, store in enumerate(stores):
         fig.add_trace(go.Scatterpolar(
-            r=normalized,
+            r=np.append(normalized[idx], normalized[idx, 0]),  # Close the polygon
             theta=categories,
             fill='toself',
             name=store
@@ -256,11 +291,13 @@ def plot_margin_vs_sales(df: pd.DataFrame, title: str = "Margin vs. Sales Analys
         Plotly scatter chart
     """
     # Filter to significant brands with valid margin data
-    significant_brands = df[
+    # Only the plotted columns are selected; loc with a mask already returns a new frame
+    significant_brands = df.loc[
         (df['Net Sales'] > 1000) &
         (df['Gross Margin %'].notna()) &
-        (df['Gross Margin %'] > 0)
-    ].copy()
+        (df['Gross Margin %'] > 0),
+        ['Brand', 'Net Sales', 'Gross Margin %']
+    ]
 
     if len(significant_brands) == 0:
         fig = go.Figure()
@@ -269,10 +306,10 @@ def plot_margin_vs_sales(df: pd.DataFrame, title: str = "Margin vs. Sales Analys
 
     # Handle margin percentage format
     max_margin = significant_brands['Gross Margin %'].max()
-    if max_margin <= 1:
-        significant_brands['Margin_Pct'] = significant_brands['Gross Margin %'] * 100
-    else:
-        significant_brands['Margin_Pct'] = significant_brands['Gross Margin %']
+    margin_scale = 100 if max_margin <= 1 else 1
+    significant_brands = significant_brands.assign(
+        Margin_Pct=significant_brands['Gross Margin %'] * margin_scale
+    )
 
     fig = px.scatter(
         significant_brands,
@@ -285,7 +322,8 @@ def plot_margin_vs_sales(df: pd.DataFrame, title: str = "Margin vs. Sales Analys
         size_max=30,
         title=title,
         log_x=True,
-        labels={'Margin_Pct': 'Gross Margin %', 'Net Sales': 'Net Sales ($)'}
+        labels={'Margin_Pct': 'Gross Margin %', 'Net Sales': 'Net Sales ($)'},
+        render_mode='webgl'
     )
 
     # Add quadrant line